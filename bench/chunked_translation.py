@@ -0,0 +1,101 @@
+# bench/chunked_translation.py
+"""
+Задержка перевода длинных сообщений: целиком против кусков по предложениям.
+
+    python bench/chunked_translation.py --messages 20 --sentences 12
+
+Мок DeepL отвечает за base-ms + per-char-us на символ, поэтому длинный текст
+целиком идёт дольше, чем параллельные куски. Третий прогон повторяет тексты
+с одним изменённым предложением — кэш переводит заново только его.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HOST, PORT = "127.0.0.1", 8798
+os.environ.setdefault("DEEPL_URL", f"http://{HOST}:{PORT}/v2/translate")
+os.environ.setdefault("DEEPL_USAGE_URL", f"http://{HOST}:{PORT}/v2/usage")
+os.environ.setdefault("TRANSLATION_RESULT_CACHE_PERSIST", "0")
+os.environ.setdefault("DEEPL_CHAR_LIMIT", "0")
+os.environ.setdefault("DEEPL_RPS", "0")
+
+from core import translator  # noqa: E402
+
+calls = {"requests": 0, "chars": 0}
+
+SENTENCE = "Сегодня я долго гулял по парку и думал о том, что рассказать тебе вечером, номер {}."
+
+
+def make_app(base: float, per_char: float) -> web.Application:
+    async def deepl(request):
+        data = await request.post()
+        texts = data.getall("text")
+        chars = sum(len(t) for t in texts)
+        await asyncio.sleep(base + chars * per_char)
+        calls["requests"] += 1
+        calls["chars"] += chars
+        return web.json_response({"translations": [{"text": f"[EN] {t}"} for t in texts]})
+
+    app = web.Application()
+    app.router.add_post("/v2/translate", deepl)
+    return app
+
+
+def make_texts(count: int, sentences: int, salt: str, changed: int = -1) -> list[str]:
+    return [
+        " ".join(
+            SENTENCE.format(f"{i}-{j}{salt}" + (" (правка)" if j == changed else ""))
+            for j in range(sentences)
+        )
+        for i in range(count)
+    ]
+
+
+async def run(name: str, texts: list[str], threshold: int) -> None:
+    translator.CHUNK_THRESHOLD = threshold
+    calls.update(requests=0, chars=0)
+    latencies = []
+    for text in texts:
+        started = time.perf_counter()
+        assert await translator.translate_text(text, "ru", "en")
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    print(
+        f"{name:<22}{statistics.median(latencies):>10.1f}{latencies[-1]:>10.1f}"
+        f"{calls['requests']:>8}{calls['chars']:>10}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--sentences", type=int, default=12)
+    parser.add_argument("--base-ms", type=float, default=40)
+    parser.add_argument("--per-char-us", type=float, default=300)
+    args = parser.parse_args()
+
+    runner = web.AppRunner(make_app(args.base_ms / 1000, args.per_char_us / 1e6))
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+
+    threshold = translator.CHUNK_THRESHOLD
+    print(f"{'mode':<22}{'p50 ms':>10}{'max ms':>10}{'HTTP':>8}{'chars':>10}")
+    try:
+        await run("whole text", make_texts(args.messages, args.sentences, "a"), threshold=10 ** 9)
+        await run("chunked", make_texts(args.messages, args.sentences, "b"), threshold=threshold)
+        await run("chunked, 1 sentence new", make_texts(args.messages, args.sentences, "b", changed=1),
+                  threshold=threshold)
+    finally:
+        await translator.close_http_client()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
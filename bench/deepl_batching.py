@@ -0,0 +1,129 @@
+# bench/deepl_batching.py
+"""
+Бенчмарк пачек DeepL против локального мок-сервера.
+
+    python bench/deepl_batching.py --requests 500 --concurrency 100 --latency-ms 40
+
+Мок отвечает на /v2/translate с задержкой latency-ms и держит не больше
+server-slots запросов одновременно (как лимит DeepL на ключ).
+Сравниваются режимы «по одному тексту» и пачки с разными окнами.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HOST, PORT = "127.0.0.1", 8799
+os.environ["DEEPL_URL"] = f"http://{HOST}:{PORT}/v2/translate"
+os.environ.setdefault("TRANSLATION_RESULT_CACHE_PERSIST", "0")
+# квоты и лимит запросов не должны уводить запросы с DeepL — меряем только пачки
+os.environ.setdefault("DEEPL_CHAR_LIMIT", "0")
+os.environ.setdefault("DEEPL_RPS", "0")
+# все провайдеры — только на мок: даже отказ DeepL не уйдёт в сеть
+os.environ["DEEPL_USAGE_URL"] = f"http://{HOST}:{PORT}/v2/usage"
+os.environ["LIBRE_URL"] = f"http://{HOST}:{PORT}/translate"
+os.environ["GOOGLE_URL"] = f"http://{HOST}:{PORT}/translate_a/single"
+
+from core import translator  # noqa: E402
+from core.batcher import MicroBatcher  # noqa: E402
+
+calls = {"requests": 0, "texts": 0, "fallback": 0}
+
+
+def make_app(latency: float, slots: int) -> web.Application:
+    sem = asyncio.Semaphore(slots)
+
+    async def deepl(request):
+        data = await request.post()
+        texts = data.getall("text")
+        async with sem:
+            await asyncio.sleep(latency)
+        calls["requests"] += 1
+        calls["texts"] += len(texts)
+        return web.json_response({
+            "translations": [{"text": f"[{data['target_lang']}] {t}"} for t in texts]
+        })
+
+    async def fallback(request):
+        # сюда попадает всё, что ушло мимо DeepL, — такой прогон меряет не пачки
+        calls["fallback"] += 1
+        return web.json_response({"error": "benchmark measures DeepL only"}, status=503)
+
+    async def usage(request):
+        return web.json_response({"character_count": 0, "character_limit": 0})
+
+    app = web.Application()
+    app.router.add_post("/v2/translate", deepl)
+    app.router.add_get("/v2/usage", usage)
+    app.router.add_post("/translate", fallback)
+    app.router.add_get("/translate_a/single", fallback)
+    return app
+
+
+async def run_mode(window_ms: float, args) -> dict:
+    translator.DEEPL_BATCH_WINDOW_MS = window_ms
+    translator._deepl_batcher = MicroBatcher(
+        translator._deepl_send_batch, window_ms / 1000, translator.DEEPL_BATCH_MAX
+    )
+    translator._result_cache.clear()
+    calls.update(requests=0, texts=0, fallback=0)
+
+    sem = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one(i):
+        async with sem:
+            start = time.perf_counter()
+            # уникальный текст — кэш результатов не помогает
+            await translator.translate_text(f"сообщение {window_ms} {i}", "ru", "en")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    assert calls["texts"] == args.requests and calls["fallback"] == 0, (
+        f"DeepL mock got {calls['texts']} of {args.requests} texts, "
+        f"fallback providers {calls['fallback']}; the run does not measure batching"
+    )
+
+    latencies.sort()
+    return {
+        "mode": f"batch {window_ms:g}ms" if window_ms > 0 else "single",
+        "throughput": args.requests / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "http": calls["requests"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--server-slots", type=int, default=4)
+    parser.add_argument("--windows", default="0,2,10,25", help="окна в мс через запятую; 0 — без пачек")
+    args = parser.parse_args()
+
+    runner = web.AppRunner(make_app(args.latency_ms / 1000, args.server_slots))
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+
+    print(f"{'mode':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'HTTP':>8}")
+    try:
+        for window in (float(w) for w in args.windows.split(",")):
+            r = await run_mode(window, args)
+            print(f"{r['mode']:<14}{r['throughput']:>10.1f}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['http']:>8}")
+    finally:
+        await translator.close_http_client()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
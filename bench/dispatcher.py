@@ -0,0 +1,86 @@
+# bench/dispatcher.py
+"""
+Пропускная способность упорядоченного диспетчера (core/dispatcher) в зависимости от параллельности.
+
+    python bench/dispatcher.py --users 200 --per-user 10 --handler-ms 20
+
+Обработчик имитирует поход в БД и Telegram (sleep handler-ms). Половина пользователей
+разбита на пары «в чате», поэтому их апдейты упорядочены ещё и с собеседником.
+После каждого прогона проверяется, что порядок апдейтов каждого пользователя сохранён.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dispatcher import OrderedDispatcher  # noqa: E402
+
+LEVELS = (1, 4, 16, 64, 256)
+
+
+def make_updates(users: int, per_user: int, seed: int = 1) -> list:
+    updates = [
+        SimpleNamespace(user_id=user, seq=seq)
+        for user in range(users)
+        for seq in range(per_user)
+    ]
+    # перемешиваем, сохраняя порядок внутри пользователя
+    rng = random.Random(seed)
+    queues = {user: [u for u in updates if u.user_id == user] for user in range(users)}
+    mixed = []
+    while queues:
+        user = rng.choice(list(queues))
+        mixed.append(queues[user].pop(0))
+        if not queues[user]:
+            del queues[user]
+    return mixed
+
+
+async def run(concurrency: int, updates: list, users: int, handler_ms: float) -> tuple:
+    seen = {}
+    violations = 0
+
+    async def handler(update):
+        nonlocal violations
+        await asyncio.sleep(handler_ms / 1000)
+        if seen.get(update.user_id, -1) != update.seq - 1:
+            violations += 1
+        seen[update.user_id] = update.seq
+
+    def keys(update):
+        # пары (0,1), (2,3), ... в первой половине пользователей
+        user = update.user_id
+        if user < users // 2:
+            return (user, user ^ 1)
+        return (user,)
+
+    dispatcher = OrderedDispatcher(handler, keys, concurrency, max_pending=len(updates))
+    started = time.perf_counter()
+    for update in updates:
+        await dispatcher.submit(update)
+    await dispatcher.drain()
+    elapsed = time.perf_counter() - started
+    return len(updates) / elapsed, violations, dispatcher.stats()["keys"]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--per-user", type=int, default=10)
+    parser.add_argument("--handler-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    updates = make_updates(args.users, args.per_user)
+    print(f"{'concurrency':>12}{'updates/s':>12}{'order errors':>14}{'keys left':>11}")
+    for level in LEVELS:
+        throughput, violations, keys_left = await run(level, updates, args.users, args.handler_ms)
+        print(f"{level:>12}{throughput:>12.1f}{violations:>14}{keys_left:>11}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+# bench/langdetect.py
+"""
+Микробенчмарк офлайн-детектора языка (core/langdetect).
+
+    python bench/langdetect.py --rounds 20000
+
+Печатает время needs_translation/detect на одно сообщение в микросекундах
+и долю сообщений, для которых кнопка перевода не нужна.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.langdetect import detect, needs_translation  # noqa: E402
+
+# (текст, язык получателя) — типичные реплики анонимного чата
+MESSAGES = [
+    ("Привет, как дела?", "en"),
+    ("Привіт, як справи?", "ru"),
+    ("Hello, how are you doing today?", "ru"),
+    ("Hola, ¿cómo estás?", "es"),
+    ("Bonjour, comment ça va ?", "de"),
+    ("Ich weiß nicht, was ich sagen soll", "de"),
+    ("😂😂😂", "en"),
+    ("https://youtu.be/dQw4w9WgXcQ", "fr"),
+    ("12:30", "uk"),
+    ("ok", "ru"),
+    ("where are you from?", "en"),
+    ("мне нравится слушать музыку по вечерам, а тебе что нравится?", "es"),
+    ("that's funny lol, what music do you like to listen to in the evening?", "fr"),
+]
+
+
+def bench(fn, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text, target in MESSAGES:
+            fn(text, target)
+    return (time.perf_counter() - started) / (rounds * len(MESSAGES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    skipped = sum(not needs_translation(text, target) for text, target in MESSAGES)
+    print(f"needs_translation: {bench(needs_translation, args.rounds):.2f} us/message")
+    print(f"detect:            {bench(lambda text, _: detect(text), args.rounds):.2f} us/message")
+    print(f"button suppressed: {skipped}/{len(MESSAGES)} sample messages")
+
+
+if __name__ == "__main__":
+    main()
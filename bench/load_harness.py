@@ -0,0 +1,336 @@
+# bench/load_harness.py
+"""
+Нагрузочный стенд всего конвейера: вебхук bot.py → PTB → handlers → Postgres.
+
+    DATABASE_URL=postgresql://... python bench/load_harness.py --users 200 --messages 10
+    python bench/load_harness.py --write-dir /tmp/scenarios          # сохранить синтетику в JSONL
+    python bench/load_harness.py --replay /tmp/scenarios/relay.jsonl  # проиграть записанные апдейты
+
+Бот поднимается в этом же процессе; Bot API и провайдеры перевода подменяет локальный
+мок-сервер (TELEGRAM_API_URL, DEEPL_URL), который запоминает sendMessage. Нужен живой
+Postgres: синтетические пользователи берутся из диапазона --base-id и удаляются перед прогоном.
+
+Апдейты одного пользователя отправляются строго по очереди, разные пользователи — параллельно
+(не больше --concurrency запросов), общий темп — не выше --rate апдейтов в секунду (0 — без ограничения).
+Для каждого сценария печатаются пропускная способность, p50/p95/p99 ответа вебхука,
+число SQL-запросов на апдейт и вызовов sendMessage.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from aiohttp import ClientSession, TCPConnector, web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TOKEN = "123456:LOADTEST"
+HOST = "127.0.0.1"
+MOCK_PORT = 8797
+BOT_PORT = 8796
+LANGS = ("ru", "en", "es", "de", "fr", "uk")
+SCENARIOS = ("registration", "topics", "matchmaking", "relay")
+
+
+# ---------- мок Bot API и провайдеров перевода ----------
+class MockBotApi:
+    def __init__(self):
+        self.calls = Counter()
+        self._message_id = 0
+
+    async def _params(self, request) -> dict:
+        if request.content_type == "application/json":
+            return await request.json()
+        return dict(await request.post())
+
+    def _message(self, chat_id, text) -> dict:
+        self._message_id += 1
+        return {
+            "message_id": self._message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": text or "",
+        }
+
+    async def bot_method(self, request):
+        method = request.match_info["method"]
+        params = await self._params(request)
+        self.calls[method] += 1
+        if method == "getMe":
+            result = {"id": 123456, "is_bot": True, "first_name": "Load", "username": "load_bot"}
+        elif method in ("sendMessage", "editMessageText"):
+            result = self._message(int(params.get("chat_id") or 0), params.get("text"))
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def deepl_translate(self, request):
+        data = await request.post()
+        return web.json_response({"translations": [{"text": t} for t in data.getall("text")]})
+
+    async def deepl_usage(self, request):
+        return web.json_response({"character_count": 0, "character_limit": 500000})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(f"/bot{TOKEN}/{{method}}", self.bot_method)
+        app.router.add_post("/v2/translate", self.deepl_translate)
+        app.router.add_get("/v2/usage", self.deepl_usage)
+        return app
+
+
+# ---------- синтетические апдейты ----------
+class UpdateFactory:
+    def __init__(self, first_update_id: int):
+        self._update_id = first_update_id
+
+    def _next_id(self) -> int:
+        self._update_id += 1
+        return self._update_id
+
+    @staticmethod
+    def _user(uid: int, lang: str) -> dict:
+        return {"id": uid, "is_bot": False, "first_name": "Load", "username": f"u{uid}", "language_code": lang}
+
+    def message(self, uid: int, lang: str, text: str) -> dict:
+        message = {
+            "message_id": self._update_id,
+            "date": int(time.time()),
+            "chat": {"id": uid, "type": "private"},
+            "from": self._user(uid, lang),
+            "text": text,
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+        return {"update_id": self._next_id(), "message": message}
+
+    def callback(self, uid: int, lang: str, data: str) -> dict:
+        return {
+            "update_id": self._next_id(),
+            "callback_query": {
+                "id": str(self._update_id),
+                "from": self._user(uid, lang),
+                "chat_instance": str(uid),
+                "data": data,
+                "message": {
+                    "message_id": 1,
+                    "date": int(time.time()),
+                    "chat": {"id": uid, "type": "private"},
+                    "text": "👋",
+                },
+            },
+        }
+
+
+def synthetic_scenarios(users: int, base_id: int, messages: int) -> dict:
+    """Регистрация → выбор темы → одновременный поиск → переписка в парах."""
+    from core.i18n import tr_lang
+
+    factory = UpdateFactory(int(time.time() * 1000))
+    scenarios = {name: [] for name in SCENARIOS}
+    for i in range(users):
+        uid, lang = base_id + i, LANGS[i % len(LANGS)]
+        scenarios["registration"] += [
+            factory.message(uid, lang, "/start"),
+            factory.callback(uid, lang, f"lang_{lang}"),
+            factory.message(uid, lang, f"load{i}"),
+            factory.message(uid, lang, tr_lang(lang, "gender_male")),
+        ]
+        scenarios["topics"] += [
+            factory.message(uid, lang, tr_lang(lang, "btn_start_chat")),
+            factory.message(uid, lang, tr_lang(lang, "it")),
+            factory.message(uid, lang, tr_lang(lang, "ai")),
+        ]
+        scenarios["matchmaking"].append(factory.message(uid, lang, tr_lang(lang, "btn_search")))
+    for n in range(messages):
+        for i in range(users):
+            uid, lang = base_id + i, LANGS[i % len(LANGS)]
+            scenarios["relay"].append(factory.message(uid, lang, f"сообщение {n} от {uid}: как дела?"))
+    return scenarios
+
+
+def read_jsonl(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl(path: str, updates: list):
+    with open(path, "w", encoding="utf-8") as f:
+        for update in updates:
+            f.write(json.dumps(update, ensure_ascii=False) + "\n")
+
+
+# ---------- отправка ----------
+def _sender_id(update: dict):
+    for kind in ("message", "edited_message", "callback_query"):
+        if kind in update:
+            return update[kind].get("from", {}).get("id")
+    return None
+
+
+async def replay(session: ClientSession, url: str, updates: list, concurrency: int, rate: float):
+    """Апдейты одного отправителя — по очереди, отправители — параллельно; темп общий."""
+    per_user = defaultdict(list)
+    for update in updates:
+        per_user[_sender_id(update)].append(update)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], Counter()
+    started = time.perf_counter()
+    slot = 0
+
+    async def paced():
+        nonlocal slot
+        if rate > 0:
+            due = started + slot / rate
+            slot += 1
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def user_chain(chain):
+        for update in chain:
+            await paced()
+            async with semaphore:
+                sent = time.perf_counter()
+                async with session.post(url, json=update) as resp:
+                    await resp.read()
+                    statuses[resp.status] += 1
+                latencies.append(time.perf_counter() - sent)
+
+    await asyncio.gather(*(user_chain(chain) for chain in per_user.values()))
+    return latencies, statuses
+
+
+async def pipeline_idle(timeout: float = 60.0):
+    """В режиме очереди вебхука (WEBHOOK_WORKERS > 0) дождаться разбора принятых апдейтов."""
+    from core.dispatcher import dispatcher_stats
+    from core.ingress import ingress_stats
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        ingress, dispatch = ingress_stats(), dispatcher_stats()
+        ingress_busy = ingress and ingress["accepted"] > ingress["processed"] + ingress["errors"]
+        dispatch_busy = dispatch and dispatch["in_flight"] > 0
+        if not ingress_busy and not dispatch_busy:
+            return
+        await asyncio.sleep(0.01)
+
+
+def percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+# ---------- прогон ----------
+async def reset_users(dsn: str, base_id: int, users: int):
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        upper = base_id + users
+        await conn.execute("UPDATE users SET companion_id = NULL WHERE companion_id BETWEEN $1 AND $2", base_id, upper)
+        await conn.execute("DELETE FROM users WHERE id BETWEEN $1 AND $2", base_id, upper)
+        if await conn.fetchval("SELECT to_regclass('search_queue') IS NOT NULL"):
+            await conn.execute("DELETE FROM search_queue WHERE user_id BETWEEN $1 AND $2", base_id, upper)
+    finally:
+        await conn.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=10, help="сообщений на пользователя в сценарии relay")
+    parser.add_argument("--base-id", type=int, default=7_000_000_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=0, help="апдейтов в секунду, 0 — без ограничения")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--replay", nargs="*", help="JSONL-файлы с апдейтами вместо синтетики")
+    parser.add_argument("--write-dir", help="сохранить синтетические сценарии в JSONL и выйти")
+    args = parser.parse_args()
+
+    if args.write_dir:
+        os.makedirs(args.write_dir, exist_ok=True)
+        for name, updates in synthetic_scenarios(args.users, args.base_id, args.messages).items():
+            write_jsonl(os.path.join(args.write_dir, f"{name}.jsonl"), updates)
+        print(f"scenarios written to {args.write_dir}")
+        return
+
+    if not args.dsn:
+        parser.error("нужен Postgres: --dsn или DATABASE_URL")
+
+    # окружение бота задаётся до импорта bot/config
+    mock_url = f"http://{HOST}:{MOCK_PORT}"
+    os.environ.update({
+        "BOT_TOKEN": TOKEN,
+        "DATABASE_URL": args.dsn,
+        "TELEGRAM_API_URL": f"{mock_url}/bot",
+        "DEEPL_URL": f"{mock_url}/v2/translate",
+        "DEEPL_USAGE_URL": f"{mock_url}/v2/usage",
+        "LIBRE_URL": f"{mock_url}/translate",
+        "GOOGLE_URL": f"{mock_url}/translate_a/single",
+    })
+    os.environ.pop("WEBHOOK_URL", None)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_FILE", os.path.join(tempfile.gettempdir(), "load_harness.log"))
+
+    if args.replay:
+        scenarios = {os.path.splitext(os.path.basename(p))[0]: read_jsonl(p) for p in args.replay}
+    else:
+        wanted = [s for s in args.scenarios.split(",") if s]
+        generated = synthetic_scenarios(args.users, args.base_id, args.messages)
+        scenarios = {name: generated[name] for name in wanted}
+        await reset_users(args.dsn, args.base_id, args.users)
+
+    mock = MockBotApi()
+    mock_runner = web.AppRunner(mock.app())
+    await mock_runner.setup()
+    await web.TCPSite(mock_runner, HOST, MOCK_PORT).start()
+
+    # счётчик SQL-запросов — на каждое соединение пула
+    from db.init_db import add_connection_hook
+    queries = Counter()
+    add_connection_hook(lambda conn: conn.add_query_logger(lambda record: queries.update(("total",))))
+
+    import bot
+    bot_runner = web.AppRunner(bot.app)
+    await bot_runner.setup()
+    await web.TCPSite(bot_runner, HOST, BOT_PORT).start()
+    url = f"http://{HOST}:{BOT_PORT}/{TOKEN}"
+
+    print(
+        f"{'scenario':<14}{'updates':>9}{'upd/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'SQL/upd':>9}{'sends':>8}{'non-200':>9}"
+    )
+    try:
+        async with ClientSession(connector=TCPConnector(limit=args.concurrency)) as session:
+            for name, updates in scenarios.items():
+                queries.clear()
+                sends_before = mock.calls["sendMessage"]
+                started = time.perf_counter()
+                latencies, statuses = await replay(session, url, updates, args.concurrency, args.rate)
+                await pipeline_idle()
+                elapsed = time.perf_counter() - started
+
+                latencies.sort()
+                failed = sum(n for status, n in statuses.items() if status != 200)
+                print(
+                    f"{name:<14}{len(updates):>9}{len(updates) / elapsed:>9.1f}"
+                    f"{percentile(latencies, 0.50):>9.1f}{percentile(latencies, 0.95):>9.1f}"
+                    f"{percentile(latencies, 0.99):>9.1f}{queries['total'] / max(1, len(updates)):>9.2f}"
+                    f"{mock.calls['sendMessage'] - sends_before:>8}{failed:>9}"
+                )
+    finally:
+        await bot_runner.cleanup()
+        await mock_runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
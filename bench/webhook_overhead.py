@@ -0,0 +1,140 @@
+# bench/webhook_overhead.py
+"""
+Накладные расходы вебхука на один апдейт: декодирование JSON и логирование.
+
+    python bench/webhook_overhead.py --updates 20000
+
+«до» — json.loads, сырой апдейт и сводка в INFO, синхронная запись в файл двумя
+обработчиками (как было в bot.py); «после» — core.fastjson, логирование сырого
+апдейта только в DEBUG, запись через QueueHandler/QueueListener. Update.de_json
+выполняется в обоих вариантах. Логи пишутся во временный каталог.
+"""
+import argparse
+import io
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Bot, Update  # noqa: E402
+
+from core import fastjson  # noqa: E402
+
+FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+PAYLOAD = json.dumps({
+    "update_id": 100500,
+    "message": {
+        "message_id": 42,
+        "date": 1700000000,
+        "chat": {"id": 123456789, "type": "private", "first_name": "Anon"},
+        "from": {"id": 123456789, "is_bot": False, "first_name": "Anon", "language_code": "ru"},
+        "text": "Привет! Как дела? Чем занимаешься сегодня вечером?",
+    },
+}, ensure_ascii=False).encode()
+
+
+def reset_logging():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    bot_logger = logging.getLogger("bench.bot")
+    for handler in list(bot_logger.handlers):
+        bot_logger.removeHandler(handler)
+        handler.close()
+
+
+def before(path: str):
+    """Как было: basicConfig(DEBUG) в файл + у логгера bot ещё файл и консоль."""
+    formatter = logging.Formatter(FORMAT)
+    root = logging.getLogger()
+    root_file = logging.FileHandler(path, mode="a")
+    root_file.setFormatter(formatter)
+    root.addHandler(root_file)
+    root.setLevel(logging.DEBUG)
+
+    logger = logging.getLogger("bench.bot")
+    logger.setLevel(logging.DEBUG)
+    extra_file = logging.FileHandler(path, mode="a")
+    extra_file.setFormatter(formatter)
+    console = logging.StreamHandler(io.StringIO())
+    console.setFormatter(formatter)
+    logger.addHandler(extra_file)
+    logger.addHandler(console)
+
+    def handle(body: bytes, bot):
+        data = json.loads(body)
+        logger.info("📨 RAW UPDATE: %s", data)
+        update = Update.de_json(data, bot)
+        summary = (
+            f"id={update.update_id} "
+            f"msg='{update.message.text if update.message else ''}' "
+            f"callback='{update.callback_query.data if update.callback_query else ''}'"
+        )
+        logger.info("🔄 Parsed update: %s", summary)
+    return handle, None
+
+
+def after(path: str):
+    """Как стало: очередь логов с ротацией, сырой апдейт только в DEBUG."""
+    formatter = logging.Formatter(FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=20 * 1024 * 1024, backupCount=2)
+    file_handler.setFormatter(formatter)
+    console = logging.StreamHandler(io.StringIO())
+    console.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console)
+    listener.start()
+
+    logger = logging.getLogger("bench.bot")
+    logger.setLevel(logging.NOTSET)
+
+    def handle(body: bytes, bot):
+        data = fastjson.loads(body)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📨 RAW UPDATE: %s", data)
+        update = Update.de_json(data, bot)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔄 Parsed update: id=%s", update.update_id)
+    return handle, listener
+
+
+def measure(name: str, factory, updates: int, workdir: str) -> float:
+    reset_logging()
+    handle, listener = factory(os.path.join(workdir, f"{name}.log"))
+    bot = Bot("123:bench")
+    started = time.perf_counter()
+    for _ in range(updates):
+        handle(PAYLOAD, bot)
+    elapsed = time.perf_counter() - started
+    if listener is not None:
+        listener.stop()
+    reset_logging()
+    return elapsed / updates * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        old = measure("before", before, args.updates, workdir)
+        new = measure("after", after, args.updates, workdir)
+    print(f"json backend: {fastjson.BACKEND}")
+    print(f"before: {old:8.2f} us/update")
+    print(f"after:  {new:8.2f} us/update  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 import os
 import logging
+import random
 import traceback
 from aiohttp import web
 
@@ -14,8 +15,21 @@ from telegram.ext import (
     filters,
 )
 
-from config import BOT_TOKEN, WEBHOOK_URL, PORT
+from config import BOT_TOKEN, WEBHOOK_URL, PORT, LOG_RAW_UPDATES_SAMPLE, TELEGRAM_API_URL
 from db.init_db import init_db
+from db.counters import start_message_flusher, stop_message_flusher
+from db.user_queries import load_active_pairs, start_user_sync
+from db.invalidation import stop_listener
+from core.matchmaking import stop_search_timers
+from core.translator import (
+    start_http_client, close_http_client, start_quota_sync, stop_quota_sync, flush_result_writes,
+)
+from db.stats import start_stats_reconciler, stop_stats_reconciler
+from core.ingress import start_ingress, stop_ingress, ingress_enabled, submit_update
+from core.dispatcher import start_dispatcher, stop_dispatcher
+from core.dedup import is_duplicate, release
+from core.fastjson import loads as json_loads
+from core.logging_setup import setup_logging
 
 # наши хендлеры
 from handlers.commands import start, choose_lang
@@ -25,28 +39,13 @@ from handlers.messages import message_handler, callback_query_handler
 # -------------------- ЛОГИРОВАНИЕ --------------------
 os.environ["PYTHONUNBUFFERED"] = "1"
 
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.DEBUG,
-    filename="bot.log",
-    filemode="a",
-)
-
+# запись в bot.log (с ротацией) и консоль — в фоновом потоке через очередь
+log_listener = setup_logging()
 logger = logging.getLogger("bot")
-logger.setLevel(logging.DEBUG)
-
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-file_handler = logging.FileHandler("bot.log", mode="a")
-file_handler.setFormatter(formatter)
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
 
 
 # -------------------- СОЗДАЁМ ПРИЛОЖЕНИЕ --------------------
-application = ApplicationBuilder().token(BOT_TOKEN).build()
+application = ApplicationBuilder().token(BOT_TOKEN).base_url(TELEGRAM_API_URL).build()
 
 
 # -------------------- РЕГИСТРАЦИЯ ХЕНДЛЕРОВ --------------------
@@ -64,26 +63,55 @@ application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, message_
 
 
 # -------------------- ВЕБХУК --------------------
+# Обработка апдейта: сам PTB или упорядоченный диспетчер (DISPATCH_CONCURRENCY > 0)
+process_update = application.process_update
+
+
 async def handle_webhook(request):
     """Получаем POST от Telegram, парсим Update и отдаём PTB."""
+    claimed = None
     try:
-        data = await request.json()
-        logger.info("📨 RAW UPDATE: %s", data)
+        data = json_loads(await request.read())
+        # сырой апдейт — только в DEBUG или для выборки LOG_RAW_UPDATES_SAMPLE
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📨 RAW UPDATE: %s", data)
+        elif LOG_RAW_UPDATES_SAMPLE and random.random() < LOG_RAW_UPDATES_SAMPLE:
+            logger.info("📨 RAW UPDATE (sampled): %s", data)
+
+        # повторная доставка уже принятого апдейта (наш «ok» не дошёл вовремя) — подтверждаем
+        # и не обрабатываем; после 503/500 id освобождается, и повтор Telegram обработается
+        update_id = data.get("update_id")
+        if update_id is not None:
+            if await is_duplicate(update_id):
+                logger.info("🔁 Duplicate update %s dropped", update_id)
+                return web.Response(text="ok")
+            claimed = update_id
 
         update = Update.de_json(data, application.bot)
 
-        summary = (
-            f"id={update.update_id} "
-            f"msg='{update.message.text if update.message else ''}' "
-            f"callback='{update.callback_query.data if update.callback_query else ''}'"
-        )
-        logger.info("🔄 Parsed update: %s", summary)
-
-        await application.process_update(update)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "🔄 Parsed update: id=%s msg=%r callback=%r",
+                update.update_id,
+                update.message.text if update.message else "",
+                update.callback_query.data if update.callback_query else "",
+            )
+
+        if ingress_enabled():
+            # очередь воркеров: отвечаем Telegram сразу, обработка — в фоне
+            if not submit_update(update):
+                logger.warning("Ingress queue is full, rejecting update %s", update.update_id)
+                await release(claimed)
+                return web.Response(status=503, text="busy", headers={"Retry-After": "1"})
+            return web.Response(text="ok")
+
+        await process_update(update)
         return web.Response(text="ok")
 
     except Exception:
         logger.exception("❌ Webhook handler crashed:\n%s", traceback.format_exc())
+        if claimed is not None:
+            await release(claimed)
         return web.Response(status=500, text="error")
 
 
@@ -91,7 +119,23 @@ async def on_startup(app):
     """Запуск приложения и установка вебхука."""
     await application.initialize()
     await init_db()
+    # таблица активных пар в памяти — из companion_id в БД
+    await load_active_pairs()
+    # несколько инстансов (MATCH_QUEUE_BACKEND=postgres): синхронизация кэшей через NOTIFY
+    await start_user_sync()
+    start_message_flusher()
+    await start_stats_reconciler()
+    await start_http_client()
+    # расход символов DeepL — сверка с /v2/usage
+    await start_quota_sync()
     await application.start()
+    global process_update
+    dispatch = start_dispatcher(application.process_update)
+    if dispatch is not None:
+        process_update = dispatch
+    # WEBHOOK_WORKERS > 0: вебхук только ставит апдейты в очередь;
+    # перед диспетчером очередь разбирает один воркер, чтобы не перепутать порядок апдейтов
+    start_ingress(process_update, workers=1 if dispatch is not None else None)
 
     if WEBHOOK_URL:
         await application.bot.set_webhook(WEBHOOK_URL)
@@ -100,7 +144,21 @@ async def on_startup(app):
 
 async def on_cleanup(app):
     """Остановка приложения."""
+    # сначала дорабатываем принятые апдейты, пока PTB ещё запущен
+    await stop_ingress()
+    await stop_dispatcher()
     await application.stop()
+    await stop_stats_reconciler()
+    await stop_listener()
+    await stop_search_timers()
+    await stop_quota_sync()
+    # дописываем переводы в translation_cache
+    await flush_result_writes()
+    await close_http_client()
+    # дописываем накопленные счётчики сообщений
+    await stop_message_flusher()
+    # и хвост очереди логов
+    log_listener.stop()
 
 
 # -------------------- ВЕБ-СЕРВЕР --------------------
@@ -5,5 +5,91 @@ import os
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 WEBHOOK_URL = os.getenv("WEBHOOK_URL")
 PORT = int(os.getenv("PORT", 10000))
+# Адрес Bot API (токен дописывается в конец); для локального стенда — адрес мок-сервера
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org/bot")
 DATABASE_URL = os.getenv("DATABASE_URL")
 ADMIN_IDS = [491000185]
+
+# Кэш записей пользователей (db/user_queries.py)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 300))
+
+# Буфер счётчиков сообщений (db/counters.py)
+MESSAGE_FLUSH_INTERVAL = float(os.getenv("MESSAGE_FLUSH_INTERVAL", 5))
+MESSAGE_FLUSH_THRESHOLD = int(os.getenv("MESSAGE_FLUSH_THRESHOLD", 500))
+
+# Живая админ-статистика (db/stats.py): как часто сверять счётчики с БД, сек
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", 600))
+
+# Очередь поиска (core/match_queue.py): "memory" — один процесс,
+# "postgres" — общая таблица search_queue для нескольких инстансов за вебхуком.
+MATCH_QUEUE_BACKEND = os.getenv("MATCH_QUEUE_BACKEND", "memory")
+# Несколько инстансов: кэш пользователей и таблица пар сбрасываются по NOTIFY от соседей
+MULTI_INSTANCE = MATCH_QUEUE_BACKEND == "postgres"
+
+# Напоминание «всё ещё ищем» и повторный матчинг (core/matchmaking.py), сек
+SEARCH_RETRY_DELAY = float(os.getenv("SEARCH_RETRY_DELAY", 60))
+
+# Тексты сообщений под кнопкой «🌐 Показать перевод» (handlers/messages.py)
+TRANSLATION_TEXT_CACHE_SIZE = int(os.getenv("TRANSLATION_TEXT_CACHE_SIZE", 20000))
+TRANSLATION_TEXT_TTL = float(os.getenv("TRANSLATION_TEXT_TTL", 6 * 3600))
+# Бюджет памяти в байтах; 0 — без ограничения по памяти
+TRANSLATION_TEXT_MAX_BYTES = int(os.getenv("TRANSLATION_TEXT_MAX_BYTES", 0))
+
+# Перевод «наперёд» для собеседников с разными языками (core/prefetch.py):
+# перевод стартует при пересылке, кнопка «🌐 Показать перевод» отвечает готовым результатом.
+TRANSLATION_PREFETCH = os.getenv("TRANSLATION_PREFETCH", "0") == "1"
+TRANSLATION_PREFETCH_CONCURRENCY = int(os.getenv("TRANSLATION_PREFETCH_CONCURRENCY", 8))
+# Доля месячного лимита символов, после которой перевод наперёд отключается:
+# остаток квоты — только для нажатий кнопки
+TRANSLATION_PREFETCH_QUOTA_RATIO = float(os.getenv("TRANSLATION_PREFETCH_QUOTA_RATIO", 0.8))
+
+# Повторные нажатия той же кнопки перевода в течение окна игнорируются (handlers/messages.py), сек
+TRANSLATION_DEBOUNCE_SECONDS = float(os.getenv("TRANSLATION_DEBOUNCE_SECONDS", 3))
+
+# Квоты и лимиты провайдеров перевода (core/quota.py)
+# Месячный лимит символов на провайдера; 0 — без лимита (у бесплатного DeepL — 500 000)
+DEEPL_CHAR_LIMIT = int(os.getenv("DEEPL_CHAR_LIMIT", 500000))
+LIBRE_CHAR_LIMIT = int(os.getenv("LIBRE_CHAR_LIMIT", 0))
+GOOGLE_CHAR_LIMIT = int(os.getenv("GOOGLE_CHAR_LIMIT", 0))
+# Доля лимита, после которой провайдер обходится заранее
+QUOTA_SOFT_RATIO = float(os.getenv("QUOTA_SOFT_RATIO", 0.95))
+# HTTP-запросов в секунду на провайдера (пачка DeepL — один запрос); 0 — без ограничения
+DEEPL_RPS = float(os.getenv("DEEPL_RPS", 10))
+LIBRE_RPS = float(os.getenv("LIBRE_RPS", 5))
+GOOGLE_RPS = float(os.getenv("GOOGLE_RPS", 5))
+# Переводов в минуту на пользователя (кнопка «🌐 Показать перевод»)
+USER_TRANSLATIONS_PER_MINUTE = float(os.getenv("USER_TRANSLATIONS_PER_MINUTE", 20))
+# Как часто сверять расход символов с DeepL /v2/usage, сек
+QUOTA_SYNC_INTERVAL = float(os.getenv("QUOTA_SYNC_INTERVAL", 900))
+
+# Приём вебхука (core/ingress.py): воркеры разбирают очередь апдейтов, вебхук отвечает сразу.
+# 0 — апдейт обрабатывается прямо в запросе вебхука, как раньше
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", 0))
+# Полная очередь — ответ 503, Telegram повторит доставку
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", 1000))
+# Сколько ждать разбора очереди при остановке, сек
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", 10))
+
+# Упорядоченный диспетчер апдейтов (core/dispatcher.py): апдейты одного пользователя
+# (и его собеседника) — по очереди, разных пользователей — параллельно.
+# 0 — выключен; иначе — сколько апдейтов обрабатывается одновременно
+DISPATCH_CONCURRENCY = int(os.getenv("DISPATCH_CONCURRENCY", 0))
+# Принятые, но не обработанные апдейты; при переполнении приём ждёт (а очередь вебхука отвечает 503)
+DISPATCH_MAX_PENDING = int(os.getenv("DISPATCH_MAX_PENDING", 1000))
+
+# Защита от повторной доставки апдейтов (core/dedup.py)
+# Сколько последних update_id помнит процесс
+UPDATE_DEDUP_SIZE = int(os.getenv("UPDATE_DEDUP_SIZE", 10000))
+# "memory" — только память процесса, "postgres" — ещё и общая таблица processed_updates
+UPDATE_DEDUP_BACKEND = os.getenv("UPDATE_DEDUP_BACKEND", "postgres" if MULTI_INSTANCE else "memory")
+# Сколько хранить update_id в processed_updates, сек (Telegram повторяет доставку не дольше суток)
+UPDATE_DEDUP_RETENTION = float(os.getenv("UPDATE_DEDUP_RETENTION", 24 * 3600))
+
+# Логирование (core/logging_setup.py)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "bot.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 20 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+# Доля апдейтов, чей сырой JSON пишется в лог на уровне INFO (0 — только при LOG_LEVEL=DEBUG)
+LOG_RAW_UPDATES_SAMPLE = float(os.getenv("LOG_RAW_UPDATES_SAMPLE", 0))
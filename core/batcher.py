@@ -0,0 +1,102 @@
+# core/batcher.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    __slots__ = ("items", "futures", "timer")
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.futures: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+    """
+    Собирает одновременные запросы с одинаковым ключом в одну пачку.
+    Пачка уходит в send(key, items) через window секунд после первого элемента
+    или сразу, как только набралось max_size; результаты раздаются ожидающим по порядку.
+    send возвращает список той же длины (None для непереведённых) или None — пачка не удалась.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Hashable, Sequence[Any]], Awaitable[Optional[list]]],
+        window: float,
+        max_size: int,
+    ):
+        self._send = send
+        self.window = window
+        self.max_size = max(1, max_size)
+        self._open: Dict[Hashable, _Batch] = {}
+        # отправляемые пачки — держим ссылки, чтобы их не собрал GC
+        self._sending = set()
+        self._stats = {"items": 0, "batches": 0, "full_batches": 0, "failed_batches": 0}
+
+    async def submit(self, key: Hashable, item: Any):
+        loop = asyncio.get_running_loop()
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = _Batch()
+            batch.timer = loop.call_later(self.window, self._flush, key, batch)
+
+        future = loop.create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+        self._stats["items"] += 1
+
+        if len(batch.items) >= self.max_size:
+            self._stats["full_batches"] += 1
+            self._flush(key, batch)
+        return await future
+
+    def _flush(self, key: Hashable, batch: _Batch):
+        # пачку могли уже отправить по размеру — тогда таймер ничего не делает
+        if self._open.get(key) is not batch:
+            return
+        del self._open[key]
+        batch.timer.cancel()
+        self._stats["batches"] += 1
+        task = asyncio.create_task(self._run(key, batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _run(self, key: Hashable, batch: _Batch):
+        try:
+            results = await self._send(key, batch.items)
+            if results is None or len(results) != len(batch.items):
+                self._stats["failed_batches"] += 1
+                results = [None] * len(batch.items)
+            for future, result in zip(batch.futures, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            self._stats["failed_batches"] += 1
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # отмена минует except Exception — ожидающие всё равно получают ответ, а не висят
+            for future in batch.futures:
+                if not future.done():
+                    future.set_result(None)
+
+    async def drain(self):
+        """Отправить открытые пачки и дождаться всех отправленных (остановка приложения)."""
+        for key, batch in list(self._open.items()):
+            self._flush(key, batch)
+        while self._sending:
+            await asyncio.gather(*list(self._sending), return_exceptions=True)
+
+    def stats(self) -> dict:
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "open": len(self._open),
+            "sending": len(self._sending),
+            "avg_batch": round(self._stats["items"] / batches, 2) if batches else 0.0,
+        }
@@ -0,0 +1,119 @@
+# core/cache.py
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+def _default_sizeof(key, value) -> int:
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class TTLCache:
+    """
+    Ограниченный LRU-кэш с временем жизни записей.
+    maxsize — предел числа записей (вытесняется самая давно использованная),
+    ttl — время жизни записи в секундах (None — без срока),
+    max_bytes — необязательный бюджет памяти; размер записи считает sizeof(key, value),
+    on_evict(key, value) — вызывается, когда запись вытеснена или устарела (но не при pop/перезаписи).
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Hashable, Any], int]] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or _default_sizeof
+        self._on_evict = on_evict
+        self._data: "OrderedDict[Hashable, tuple[float, Any, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+    def _drop(self, key: Hashable):
+        _, value, size = self._data.pop(key)
+        self.bytes -= size
+        return value
+
+    def _alive(self, key: Hashable, stored_at: float) -> bool:
+        if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+            return True
+        value = self._drop(key)
+        self.expired += 1
+        if self._on_evict:
+            self._on_evict(key, value)
+        return False
+
+    def get(self, key: Hashable, default=None):
+        """Достать значение (учитывается в hit/miss и продлевает LRU-позицию)."""
+        item = self._data.get(key)
+        if item is None or not self._alive(key, item[0]):
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def peek(self, key: Hashable, default=None):
+        """Посмотреть значение без влияния на статистику и порядок LRU."""
+        item = self._data.get(key)
+        if item is None or not self._alive(key, item[0]):
+            return default
+        return item[1]
+
+    def set(self, key: Hashable, value) -> None:
+        if key in self._data:
+            self._drop(key)
+        size = self._sizeof(key, value) if self.max_bytes else 0
+        self._data[key] = (time.monotonic(), value, size)
+        self.bytes += size
+        while self._data and (
+            len(self._data) > self.maxsize
+            or (self.max_bytes and self.bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            value = self._drop(key)
+            self.evictions += 1
+            if self._on_evict:
+                self._on_evict(key, value)
+
+    def pop(self, key: Hashable, default=None):
+        if key not in self._data:
+            return default
+        return self._drop(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+        if self.max_bytes:
+            stats["bytes"] = self.bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
@@ -0,0 +1,113 @@
+# core/dedup.py
+import logging
+import time
+from typing import Dict, List, Optional
+
+from config import UPDATE_DEDUP_SIZE, UPDATE_DEDUP_BACKEND, UPDATE_DEDUP_RETENTION
+from db.init_db import get_db
+
+logger = logging.getLogger(__name__)
+
+
+class RecentIds:
+    """
+    Последние capacity идентификаторов: кольцевой буфер задаёт порядок вытеснения,
+    словарь id -> ячейка кольца — проверку за O(1). Память фиксирована: capacity ячеек и столько же ключей.
+    """
+
+    def __init__(self, capacity: int):
+        self._ring: List[Optional[int]] = [None] * capacity
+        self._slots: Dict[int, int] = {}
+        self._pos = 0
+
+    def __contains__(self, item: int) -> bool:
+        return item in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, item: int) -> bool:
+        """Запомнить item; False — он уже был среди последних."""
+        if item in self._slots:
+            return False
+        oldest = self._ring[self._pos]
+        if oldest is not None:
+            del self._slots[oldest]
+        self._ring[self._pos] = item
+        self._slots[item] = self._pos
+        self._pos = (self._pos + 1) % len(self._ring)
+        return True
+
+    def discard(self, item: int):
+        # ячейку освобождаем: иначе, когда id запомнят заново, старая ячейка вытеснит его раньше срока
+        slot = self._slots.pop(item, None)
+        if slot is not None:
+            self._ring[slot] = None
+
+
+_recent = RecentIds(UPDATE_DEDUP_SIZE)
+_stats = {"checked": 0, "duplicates": 0, "db_duplicates": 0, "db_errors": 0, "pruned": 0}
+_PRUNE_INTERVAL = 600
+_last_prune = 0.0
+
+
+async def _claim_in_db(update_id: int) -> bool:
+    """True — апдейт здесь первый раз (ни один инстанс его ещё не взял)."""
+    global _last_prune
+    pool = await get_db()
+    async with pool.acquire() as conn:
+        claimed = await conn.fetchval(
+            """
+            INSERT INTO processed_updates (update_id) VALUES ($1::BIGINT)
+            ON CONFLICT (update_id) DO NOTHING
+            RETURNING true
+            """,
+            update_id
+        )
+        now = time.monotonic()
+        if now - _last_prune >= _PRUNE_INTERVAL:
+            _last_prune = now
+            status = await conn.execute(
+                "DELETE FROM processed_updates WHERE seen_at < now() - make_interval(secs => $1)",
+                UPDATE_DEDUP_RETENTION
+            )
+            _stats["pruned"] += int(status.split()[-1])
+    return bool(claimed)
+
+
+async def is_duplicate(update_id: int) -> bool:
+    """Видели ли этот update_id раньше; первый вызов для id его и запоминает."""
+    _stats["checked"] += 1
+    if not _recent.add(update_id):
+        _stats["duplicates"] += 1
+        return True
+
+    if UPDATE_DEDUP_BACKEND == "postgres":
+        try:
+            if not await _claim_in_db(update_id):
+                _stats["duplicates"] += 1
+                _stats["db_duplicates"] += 1
+                return True
+        except Exception:
+            # лучше изредка обработать повтор, чем потерять апдейт из-за БД
+            _stats["db_errors"] += 1
+            logger.exception("Failed to record update %s", update_id)
+    return False
+
+
+async def release(update_id: int):
+    """Забыть update_id, который мы не обработали (503 или 500) — повторная доставка должна пройти."""
+    _recent.discard(update_id)
+    if UPDATE_DEDUP_BACKEND != "postgres":
+        return
+    try:
+        pool = await get_db()
+        async with pool.acquire() as conn:
+            await conn.execute("DELETE FROM processed_updates WHERE update_id = $1::BIGINT", update_id)
+    except Exception:
+        _stats["db_errors"] += 1
+        logger.exception("Failed to release update %s", update_id)
+
+
+def dedup_stats() -> dict:
+    return {**_stats, "remembered": len(_recent), "backend": UPDATE_DEDUP_BACKEND}
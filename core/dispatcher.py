@@ -0,0 +1,121 @@
+# core/dispatcher.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence
+
+from config import DISPATCH_CONCURRENCY, DISPATCH_MAX_PENDING
+from core.metrics import latency
+from core.pairs import companion_of
+
+logger = logging.getLogger(__name__)
+
+
+class OrderedDispatcher:
+    """
+    Апдейты с общим ключом (пользователь, а в чате — и его собеседник) выполняются строго
+    в порядке поступления, разные ключи — параллельно, не больше concurrency одновременно.
+    Порядок держится цепочкой: апдейт ждёт завершения предыдущего апдейта по каждому своему ключу.
+    Хвост цепочки удаляется, как только по ключу не осталось апдейтов, — таблица не растёт.
+    max_pending ограничивает число принятых, но не законченных апдейтов: submit ждёт свободного места.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable],
+        keys: Callable[[Any], Sequence[Hashable]],
+        concurrency: int,
+        max_pending: int,
+    ):
+        self._handler = handler
+        self._keys = keys
+        self._running = asyncio.Semaphore(concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+        self.concurrency = concurrency
+        self._tails: Dict[Hashable, asyncio.Future] = {}
+        self._tasks = set()
+        self._wait = latency("dispatch_wait")
+        self._stats = {"submitted": 0, "processed": 0, "errors": 0, "max_keys": 0}
+
+    async def submit(self, update: Any):
+        """Принять апдейт в обработку; возвращается сразу, как только нашлось место."""
+        await self._pending.acquire()
+        keys = list(dict.fromkeys(k for k in self._keys(update) if k is not None))
+        previous = [self._tails[k] for k in keys if k in self._tails]
+        done = asyncio.get_running_loop().create_future()
+        for key in keys:
+            self._tails[key] = done
+        if len(self._tails) > self._stats["max_keys"]:
+            self._stats["max_keys"] = len(self._tails)
+
+        self._stats["submitted"] += 1
+        task = asyncio.create_task(self._run(update, keys, previous, done))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, update: Any, keys: List[Hashable], previous: List[asyncio.Future], done: asyncio.Future):
+        started = time.perf_counter()
+        try:
+            for future in previous:
+                await future
+            async with self._running:
+                self._wait.observe(time.perf_counter() - started)
+                await self._handler(update)
+            self._stats["processed"] += 1
+        except Exception:
+            self._stats["errors"] += 1
+            logger.exception("Dispatcher failed to process update")
+        finally:
+            done.set_result(None)
+            for key in keys:
+                # следующий апдейт по ключу уже поставил свой хвост — его не трогаем
+                if self._tails.get(key) is done:
+                    del self._tails[key]
+            self._pending.release()
+
+    async def drain(self):
+        """Дождаться всех принятых апдейтов (остановка приложения)."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "in_flight": len(self._tasks),
+            "keys": len(self._tails),
+            "concurrency": self.concurrency,
+            "wait": self._wait.snapshot(),
+        }
+
+
+def update_keys(update) -> Sequence[Hashable]:
+    """Ключи очерёдности апдейта Telegram: сам пользователь и его текущий собеседник."""
+    user = getattr(update, "effective_user", None)
+    if user is None:
+        return ()
+    companion_id = companion_of(user.id)
+    return (user.id, companion_id) if companion_id else (user.id,)
+
+
+_dispatcher: Optional[OrderedDispatcher] = None
+
+
+def start_dispatcher(handler: Callable[[Any], Awaitable]) -> Optional[Callable[[Any], Awaitable]]:
+    """DISPATCH_CONCURRENCY > 0 — вернуть submit диспетчера, иначе None (апдейты идут как раньше)."""
+    global _dispatcher
+    if DISPATCH_CONCURRENCY <= 0:
+        return None
+    if _dispatcher is None:
+        _dispatcher = OrderedDispatcher(handler, update_keys, DISPATCH_CONCURRENCY, DISPATCH_MAX_PENDING)
+    return _dispatcher.submit
+
+
+async def stop_dispatcher():
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.drain()
+        _dispatcher = None
+
+
+def dispatcher_stats() -> dict:
+    return _dispatcher.stats() if _dispatcher is not None else {}
@@ -0,0 +1,17 @@
+# core/fastjson.py
+"""Декодер JSON для вебхука: orjson, если установлен, иначе стандартный json."""
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+    loads = orjson.loads
+else:
+    BACKEND = "json"
+
+    def loads(data: bytes):
+        return json.loads(data)
@@ -0,0 +1,111 @@
+# core/ingress.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+from config import WEBHOOK_WORKERS, WEBHOOK_QUEUE_SIZE, WEBHOOK_DRAIN_TIMEOUT
+from core.metrics import latency
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateIngress:
+    """
+    Ограниченная очередь входящих апдейтов и пул воркеров, которые её разбирают.
+    Вебхук только кладёт апдейт (submit) и сразу отвечает; если очередь полна,
+    submit возвращает False — вебхук отвечает 503, и Telegram повторит доставку позже.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable], workers: int, maxsize: int):
+        self._handler = handler
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._tasks: List[asyncio.Task] = []
+        self._wait = latency("ingress_wait")
+        self._stats = {"accepted": 0, "rejected": 0, "processed": 0, "errors": 0, "max_depth": 0}
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Дождаться разбора очереди (не дольше timeout) и остановить воркеров."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Ingress stopped with %d updates still queued", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, update: Any) -> bool:
+        try:
+            self._queue.put_nowait((time.perf_counter(), update))
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            return False
+        self._stats["accepted"] += 1
+        depth = self._queue.qsize()
+        if depth > self._stats["max_depth"]:
+            self._stats["max_depth"] = depth
+        return True
+
+    async def _worker(self, n: int):
+        while True:
+            enqueued_at, update = await self._queue.get()
+            self._wait.observe(time.perf_counter() - enqueued_at)
+            try:
+                await self._handler(update)
+                self._stats["processed"] += 1
+            except Exception:
+                self._stats["errors"] += 1
+                logger.exception("Ingress worker %d failed to process update", n)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "depth": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "workers": len(self._tasks),
+            "wait": self._wait.snapshot(),
+        }
+
+
+_ingress: Optional[UpdateIngress] = None
+
+
+def start_ingress(handler: Callable[[Any], Awaitable], workers: Optional[int] = None) -> bool:
+    """Включить очередь, если WEBHOOK_WORKERS > 0; иначе вебхук обрабатывает апдейты сам."""
+    global _ingress
+    if WEBHOOK_WORKERS <= 0:
+        return False
+    if _ingress is None:
+        _ingress = UpdateIngress(handler, workers or WEBHOOK_WORKERS, WEBHOOK_QUEUE_SIZE)
+    _ingress.start()
+    return True
+
+
+async def stop_ingress():
+    global _ingress
+    if _ingress is not None:
+        await _ingress.stop(WEBHOOK_DRAIN_TIMEOUT)
+        _ingress = None
+
+
+def ingress_enabled() -> bool:
+    return _ingress is not None
+
+
+def submit_update(update: Any) -> bool:
+    return _ingress.submit(update)
+
+
+def ingress_stats() -> dict:
+    return _ingress.stats() if _ingress is not None else {}
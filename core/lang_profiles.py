@@ -0,0 +1,61 @@
+# core/lang_profiles.py
+"""
+Профили языков для core/langdetect: частые служебные слова и триграммы
+(в порядке убывания частоты, «_» — граница слова). Собраны по общеупотребительной
+лексике и подходят для коротких реплик чата, а не для научной классификации.
+"""
+
+WORDS = {
+    "en": """the and you to is it of in that for are was what with have this not but
+        be on do me my your so just like know can we all how about yes no im dont
+        its if they he she will would there get what's good hi hello thanks why""",
+    "es": """que de no la el es y en lo un por me una te los se con para mi pero
+        las del como más al qué sí bien tu está estoy eres hola gracias muy yo
+        también porque cuando donde tengo esto eso hay""",
+    "fr": """de la le et les des en un une est que je pas vous pour il qui ne sur
+        au avec ce tu mais on ça oui non bien suis es merci bonjour salut très
+        moi toi fait comme pourquoi quand où aussi""",
+    "de": """der die und ist das nicht ich du es sie zu ein den mit sich von auf
+        für ja nein was wie wir mir dich dir bin bist auch aber noch hallo danke
+        gut sehr warum wenn schon mal kann""",
+    "it": """di che il la non è e per un una sono mi ti ho lo gli le del della
+        con ma si io tu come anche più cosa ciao grazie bene perché quando dove
+        sei molto questo""",
+    "pt": """de que não o a é e do da em um uma para com os as eu você se mas
+        por isso está estou muito sim obrigado olá bem também quando onde tudo
+        meu minha""",
+    "ru": """и в не на я что ты с как а это он то по но да нет все так у мне
+        меня тебя его же вы бы мы только уже есть был было привет спасибо
+        хорошо почему когда где очень тоже""",
+    "uk": """і в не на я що ти з як а це він то по але так ні все у мені мене
+        тебе його ж ви б ми тільки вже є був було привіт дякую добре чому коли
+        де дуже теж також""",
+}
+
+TRIGRAMS = {
+    "en": """_th the he_ _an nd_ and ing ng_ _to _of of_ ed_ _in er_ is_ ion tio
+        on_ _is re_ es_ in_ at_ ent _co _be hat _wh _ha ll_ _it ou_ _yo you
+        ly_ for _fo or_ ter her _re st_ _wa as_ _so e_t ere ve_ _wi wit ith
+        _me _we _no ow_ his ght ome""",
+    "es": """_de de_ _la os_ la_ el_ es_ _qu que ue_ _el _co _en ent en_ _lo as_
+        _se ión ció _es ado do_ _pa _un nte _po a_d _ma _ca con par aci est
+        _mi _ta era _re ien tra _pe ero mos _tu _ha sta _no ía_ _si os_""",
+    "fr": """_de es_ de_ _le ent le_ nt_ la_ _la e_d _co on_ re_ ion tio _pa
+        _et et_ les _qu que ue_ _un _re ne_ men _pr _di _ne _ce ait our _po
+        _da ais _ma _je _vo vou ous _pe _su eur _ca est _es _tr _no _mo ez_""",
+    "de": """en_ er_ _de der ie_ _di die ch_ ein sch ich nd_ und _un cht _ei
+        te_ ung _ge ge_ in_ _be den _da che _zu gen ine ten _ni nic ht_ _si
+        _ic _ha _wi ist st_ _mi _au auf _so _ve ver _fü für _wa eit """,
+    "it": """_di di_ _de to_ la_ _la _co re_ _ch che he_ _il il_ are _pe _in
+        one _co _ma ell _no non on_ no_ ent ato _un _qu per _pr zio ion _so
+        _es _se _pa lla _mi gli _ti _ci ere _pi più _ri tto _so""",
+    "pt": """_de de_ os_ _qu que ue_ _co do_ da_ ão_ _a_ ent _se _pa _do _da
+        ção açã _es _ma _pr nte _um _no men ado as_ est ara _ca par _po _nã
+        não ais _mu uit ito _vo ocê voc _eu _ta _me _te""",
+    "ru": """_по ть_ _на ого _пр то_ ени _не ост _ко ет_ ова ст_ ани _ка на_
+        ать про ние ет_ _чт что то_ _эт это _ме ет_ _ка как _во _ты ты_ ся_
+        _бы _мн мне _ве _хо ешь ает _де _ра ый_ ыл_ был _вс все""",
+    "uk": """_по _на ння _пр ти_ _не ого _ко на_ ост _ка ати ся_ _що що_ про
+        ьно _ві від _за ний ати ої_ ів_ _це це_ _як як_ _ти ти_ _бу бу_ _мо
+        _ме мен ені _ду уже дуж _ді _ча _ра ає_ єш_ ї_ _ї""",
+}
@@ -0,0 +1,133 @@
+# core/langdetect.py
+"""
+Офлайн-проверка «нужен ли перевод» без обращения к провайдерам.
+Сначала письменность (кириллица/латиница/прочее), затем внутри письменности —
+служебные слова, характерные буквы и триграммы из core/lang_profiles.
+Неуверенный ответ всегда в пользу перевода: лишняя кнопка дешевле пропущенной.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from core.lang_profiles import TRIGRAMS, WORDS
+
+CYRILLIC, LATIN, OTHER = "cyrillic", "latin", "other"
+
+_SCRIPT_LANGS = {
+    CYRILLIC: ("ru", "uk"),
+    LATIN: ("en", "es", "fr", "de", "it", "pt"),
+}
+_LANG_SCRIPT = {lang: script for script, langs in _SCRIPT_LANGS.items() for lang in langs}
+# коды языков пользователей → коды профилей
+_ALIASES = {"br": "pt"}
+
+# буквы, которые почти однозначно указывают на язык внутри своей письменности
+_DISTINCT_LETTERS = {
+    "ы": ("ru",), "э": ("ru",), "ъ": ("ru",), "ё": ("ru",),
+    "і": ("uk",), "ї": ("uk",), "є": ("uk",), "ґ": ("uk",),
+    "ñ": ("es",),
+    "ß": ("de",), "ä": ("de",), "ö": ("de",), "ü": ("de",),
+    "œ": ("fr",), "ê": ("fr",), "î": ("fr",), "û": ("fr",), "ë": ("fr",),
+    "ç": ("fr", "pt"), "ã": ("pt",), "õ": ("pt",),
+    "ò": ("it",), "ì": ("it",),
+}
+
+_WORD_WEIGHT = 3.0
+_LETTER_WEIGHT = 4.0
+# во сколько раз лучший язык должен обойти второй, чтобы ему поверить
+_MARGIN = 1.5
+
+_NOISE = re.compile(r"(?:https?://|www\.)\S+|\S+@\S+\.\S+|[@#/]\w+")
+_WORDS = re.compile(r"[^\W\d_]+")
+
+
+def _build_index() -> Tuple[Dict[str, tuple], Dict[str, tuple]]:
+    words: Dict[str, List[tuple]] = {}
+    for lang, text in WORDS.items():
+        for word in set(text.split()):
+            words.setdefault(word, []).append(lang)
+    # слово из нескольких языков весит меньше
+    word_index = {
+        word: tuple((lang, _WORD_WEIGHT / len(langs)) for lang in langs)
+        for word, langs in words.items()
+    }
+
+    trigram_index: Dict[str, List[tuple]] = {}
+    for lang, text in TRIGRAMS.items():
+        ranked = list(dict.fromkeys(g.replace("_", " ") for g in text.split() if len(g) == 3))
+        for rank, gram in enumerate(ranked):
+            trigram_index.setdefault(gram, []).append((lang, 1.0 - rank / len(ranked)))
+    return word_index, {gram: tuple(w) for gram, w in trigram_index.items()}
+
+
+_WORD_INDEX, _TRIGRAM_INDEX = _build_index()
+
+
+def _script_of(words: List[str]) -> str:
+    cyrillic = latin = other = 0
+    for word in words:
+        ch = word[0]
+        if "Ѐ" <= ch <= "ӿ":
+            cyrillic += len(word)
+        elif ch <= "ɏ":
+            latin += len(word)
+        else:
+            other += len(word)
+    if cyrillic >= latin and cyrillic >= other:
+        return CYRILLIC
+    return LATIN if latin >= other else OTHER
+
+
+def _words(text: str) -> List[str]:
+    return _WORDS.findall(_NOISE.sub(" ", text.lower()))
+
+
+def detect(text: str) -> Optional[str]:
+    """Язык сообщения из известных профилей или None, если уверенности нет."""
+    words = _words(text)
+    if not words:
+        return None
+    return _detect(words, _script_of(words))
+
+
+def _detect(words: List[str], script: str) -> Optional[str]:
+    langs = _SCRIPT_LANGS.get(script)
+    if not langs:
+        return None
+
+    scores = dict.fromkeys(langs, 0.0)
+    for word in words:
+        for lang, weight in _WORD_INDEX.get(word, ()):
+            if lang in scores:
+                scores[lang] += weight
+        for ch in set(word):
+            for lang in _DISTINCT_LETTERS.get(ch, ()):
+                scores[lang] += _LETTER_WEIGHT
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            for lang, weight in _TRIGRAM_INDEX.get(padded[i:i + 3], ()):
+                if lang in scores:
+                    scores[lang] += weight
+
+    (best, top), (_, second) = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:2]
+    if top >= 1.0 and top >= second * _MARGIN:
+        return best
+    return None
+
+
+def needs_translation(text: str, target_lang: str) -> bool:
+    """
+    False — переводить нечего (эмодзи, ссылки, числа) или текст уже на языке получателя.
+    True — во всех остальных случаях, включая неуверенные.
+    """
+    words = _words(text)
+    if not words:
+        return False
+
+    target = _ALIASES.get(target_lang.lower(), target_lang.lower())
+    target_script = _LANG_SCRIPT.get(target)
+    if target_script is None:
+        return True
+    script = _script_of(words)
+    if script != target_script:
+        return True
+    return _detect(words, script) != target
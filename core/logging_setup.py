@@ -0,0 +1,36 @@
+# core/logging_setup.py
+import logging
+import logging.handlers
+import queue
+
+from config import LOG_LEVEL, LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT
+
+FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Логи не пишутся на диск в потоке событий: корневой логгер кладёт записи в очередь
+    (QueueHandler), а файл с ротацией и консоль обслуживает фоновый поток QueueListener.
+    Вернуть listener — его нужно остановить при завершении, чтобы дописать хвост очереди.
+    """
+    formatter = logging.Formatter(FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+    )
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    return listener
@@ -0,0 +1,212 @@
+# core/match_queue.py
+import itertools
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from db.init_db import get_db
+
+ANY_SUB = "any_sub"
+
+
+@dataclass
+class QueueEntry:
+    """Снимок ожидающего пользователя на момент постановки в очередь."""
+    user_id: int
+    theme: str
+    sub: str
+    lang: str
+    seq: int = 0
+    enqueued_at: Optional[datetime] = None
+
+
+class MatchIndex:
+    """
+    Индекс ожидающих: theme -> sub -> OrderedDict[user_id, QueueEntry].
+    Подтема any_sub — отдельная wildcard-лента внутри темы.
+    Поиск пары и удаление — O(1), без обращений к БД.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, QueueEntry] = {}
+        self._lanes: Dict[str, Dict[str, "OrderedDict[int, QueueEntry]"]] = {}
+        self._seq = itertools.count()
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, user_id: int, theme: str, sub: str, lang: str) -> QueueEntry:
+        """
+        Поставить пользователя в конец своей ленты. Если он уже ждёт в той же ленте
+        (повторный поиск по таймеру), место в очереди сохраняется.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None and entry.theme == theme and entry.sub == sub:
+            entry.lang = lang
+            return entry
+        self.remove(user_id)
+        entry = QueueEntry(user_id, theme, sub, lang, next(self._seq))
+        self._entries[user_id] = entry
+        self._lanes.setdefault(theme, {}).setdefault(sub, OrderedDict())[user_id] = entry
+        return entry
+
+    def restore(self, entry: QueueEntry):
+        """Вернуть забранного pop_match кандидата на его прежнее место (по seq)."""
+        if entry.user_id in self._entries:
+            return
+        self._entries[entry.user_id] = entry
+        lane = self._lanes.setdefault(entry.theme, {}).setdefault(entry.sub, OrderedDict())
+        later = [uid for uid, other in lane.items() if other.seq > entry.seq]
+        lane[entry.user_id] = entry
+        # лента упорядочена по seq: стоявших позже переносим за вернувшегося
+        for uid in later:
+            lane.move_to_end(uid)
+
+    def remove(self, user_id: int) -> Optional[QueueEntry]:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return None
+
+        subs = self._lanes.get(entry.theme)
+        lane = subs.get(entry.sub) if subs else None
+        if lane is not None:
+            lane.pop(user_id, None)
+            # пустые ленты не храним — any_sub перебирает только живые
+            if not lane:
+                del subs[entry.sub]
+                if not subs:
+                    del self._lanes[entry.theme]
+        return entry
+
+    def pop_match(self, theme: str, sub: str, exclude: Optional[int] = None) -> Optional[QueueEntry]:
+        """
+        Забрать самого давнего совместимого собеседника, кроме exclude (сам ищущий):
+        конкретная подтема — своя лента + any_sub; any_sub — любая лента темы.
+        """
+        subs = self._lanes.get(theme)
+        if not subs:
+            return None
+
+        if sub == ANY_SUB:
+            lanes = subs.values()
+        else:
+            lanes = [lane for lane in (subs.get(sub), subs.get(ANY_SUB)) if lane]
+
+        best = None
+        for lane in lanes:
+            # ищущий сам может стоять в ленте — тогда берём следующего за ним
+            head = next((e for e in lane.values() if e.user_id != exclude), None)
+            if head is not None and (best is None or head.seq < best.seq):
+                best = head
+
+        if best is not None:
+            self.remove(best.user_id)
+        return best
+
+
+# ---------- Бэкенды очереди для core/matchmaking ----------
+class MemoryMatchQueue:
+    """Очередь одного процесса поверх MatchIndex."""
+
+    def __init__(self):
+        self.index = MatchIndex()
+
+    async def enqueue(self, user_id: int, theme: str, sub: str, lang: str):
+        self.index.add(user_id, theme, sub, lang)
+
+    async def requeue(self, entry: QueueEntry):
+        self.index.restore(entry)
+
+    async def remove(self, user_id: int):
+        self.index.remove(user_id)
+
+    async def pop_match(self, user_id: int, theme: str, sub: str) -> Optional[QueueEntry]:
+        return self.index.pop_match(theme, sub, exclude=user_id)
+
+    async def size(self) -> int:
+        return len(self.index)
+
+
+class PostgresMatchQueue:
+    """
+    Общая очередь в таблице search_queue — для нескольких процессов за одним вебхуком.
+    Кандидат забирается DELETE ... FOR UPDATE SKIP LOCKED: два процесса не получат одного и того же.
+    """
+
+    async def enqueue(self, user_id: int, theme: str, sub: str, lang: str):
+        pool = await get_db()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO search_queue (user_id, theme, sub, lang)
+                VALUES ($1::BIGINT, $2, $3, $4)
+                ON CONFLICT (user_id) DO UPDATE
+                SET theme = EXCLUDED.theme, sub = EXCLUDED.sub, lang = EXCLUDED.lang,
+                    -- повторный поиск в той же ленте не теряет место в очереди
+                    enqueued_at = CASE
+                        WHEN search_queue.theme = EXCLUDED.theme AND search_queue.sub = EXCLUDED.sub
+                        THEN search_queue.enqueued_at ELSE now()
+                    END
+                """,
+                user_id, theme, sub, lang
+            )
+
+    async def requeue(self, entry: QueueEntry):
+        """Вернуть кандидата с прежним enqueued_at; если он уже встал заново — не трогаем."""
+        pool = await get_db()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO search_queue (user_id, theme, sub, lang, enqueued_at)
+                VALUES ($1::BIGINT, $2, $3, $4, COALESCE($5, now()))
+                ON CONFLICT (user_id) DO NOTHING
+                """,
+                entry.user_id, entry.theme, entry.sub, entry.lang, entry.enqueued_at
+            )
+
+    async def remove(self, user_id: int):
+        pool = await get_db()
+        async with pool.acquire() as conn:
+            await conn.execute("DELETE FROM search_queue WHERE user_id = $1::BIGINT", user_id)
+
+    async def pop_match(self, user_id: int, theme: str, sub: str) -> Optional[QueueEntry]:
+        pool = await get_db()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                """
+                DELETE FROM search_queue
+                WHERE user_id = (
+                    SELECT user_id FROM search_queue
+                    WHERE theme = $2
+                      AND user_id <> $1::BIGINT
+                      AND ($3 = 'any_sub' OR sub = $3 OR sub = 'any_sub')
+                    ORDER BY enqueued_at
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING user_id, theme, sub, lang, enqueued_at
+                """,
+                user_id, theme, sub
+            )
+        if not row:
+            return None
+        return QueueEntry(
+            row["user_id"], row["theme"], row["sub"], row["lang"] or "en", enqueued_at=row["enqueued_at"]
+        )
+
+    async def size(self) -> int:
+        pool = await get_db()
+        async with pool.acquire() as conn:
+            return await conn.fetchval("SELECT COUNT(*) FROM search_queue")
+
+
+def create_match_queue(backend: str):
+    if backend == "postgres":
+        return PostgresMatchQueue()
+    if backend != "memory":
+        raise ValueError(f"Unknown match queue backend: {backend!r}")
+    return MemoryMatchQueue()
@@ -1,21 +1,13 @@
 # core/matchmaking.py
-import asyncio
 import logging
-from collections import deque
-from typing import Deque, Dict
-
-from db.user_queries import (
-    get_user,
-    update_user_state,
-    update_user_companion,
-)
+
+from db.user_queries import get_user, pair_users
 from handlers.keyboards import kb_chat
 from core.i18n import tr_lang
-
-
-from datetime import datetime
-
-from db.user_queries import start_chat_timer, stop_chat_timer
+from core.match_queue import ANY_SUB, create_match_queue
+from core.scheduler import TimerWheel
+from config import MATCH_QUEUE_BACKEND, SEARCH_RETRY_DELAY
+from core.pairs import companion_of
 
 
 logger = logging.getLogger(__name__)
@@ -30,25 +22,24 @@ LANGUAGE_NAMES = {
     "de": "Deutsch",
 }
 
-# Очередь и таймеры повторного поиска
-queue: Deque[int] = deque()
-active_search_tasks: Dict[int, asyncio.Task] = {}
+# Очередь ожидающих (память процесса или общая таблица в Postgres)
+match_queue = create_match_queue(MATCH_QUEUE_BACKEND)
+# Таймеры повторного поиска всех ищущих — одно колесо, один фоновый таск
+search_timers = TimerWheel(tick=1.0)
 
 
 async def remove_from_queue(user_id: int):
     """Убрать пользователя из очереди и отменить его ретрай-таймер (безопасно вызывать где угодно)."""
-    try:
-        if user_id in queue:
-            queue.remove(user_id)
-    except ValueError:
-        pass
+    await match_queue.remove(user_id)
+    search_timers.cancel(user_id)
 
-    task = active_search_tasks.pop(user_id, None)
-    if task and not task.done():
-        try:
-            task.cancel()
-        except Exception:
-            logger.exception("Failed to cancel search task for %s", user_id)
+
+def search_timer_stats() -> dict:
+    return search_timers.stats()
+
+
+async def stop_search_timers():
+    await search_timers.stop()
 
 
 def _safe_tr(lang: str, key: str, **kwargs) -> str:
@@ -67,79 +58,62 @@ def _safe_tr(lang: str, key: str, **kwargs) -> str:
     return key
 
 
-async def add_to_queue(user_id: int, theme: str, sub: str, context):
+async def add_to_queue(user_id: int, theme: str, sub: str, context, lang: str | None = None):
     """
     Поставить пользователя в очередь (предполагается, что state=searching уже выставлен),
     и попытаться сразу найти пару по теме и совместимой подтеме (учёт any_sub).
+    lang — язык пользователя; если не передан, читаем из БД.
     """
-    user = await get_user(user_id)
-    if not user:
-        logger.debug("add_to_queue: user not found %s", user_id)
-        return
-
-    # Пробуем найти пару среди уже ожидающих
-    for other_id in list(queue):
-        if other_id == user_id:
-            continue
-
-        other = await get_user(other_id)
-        if not other:
-            # мусор — удалим
-            try:
-                queue.remove(other_id)
-            except ValueError:
-                pass
-            continue
-
-        same_theme = (other.get("theme") == theme)
-        sub_match = (
-            sub == other.get("sub")
-            or sub == "any_sub"
-            or other.get("sub") == "any_sub"
-        )
-
-        if not (same_theme and sub_match):
-            continue
-
-        # Нашли пару — подчистим очередь у обоих
-        for uid in (user_id, other_id):
-            try:
-                if uid in queue:
-                    queue.remove(uid)
-            except ValueError:
-                pass
-
-        # Ставим обоим state=chatting и запоминаем companion
-        await update_user_state(user_id, "chatting")
-        await update_user_state(other_id, "chatting")
-        now = datetime.utcnow()
-        await set_chat_started(user_id, now)
-        await set_chat_started(other_id, now)
-        await update_user_companion(user_id, other_id)
-        await update_user_companion(other_id, user_id)
+    if lang is None:
+        user = await get_user(user_id)
+        if not user:
+            logger.debug("add_to_queue: user not found %s", user_id)
+            return
+        lang = user.get("lang")
+    lang = lang or "en"
+
+    # Пробуем найти пару среди уже ожидающих. При повторном поиске по таймеру своя запись
+    # остаётся в очереди (место не теряется) — pop_match пропускает самого ищущего
+    other = None
+    while True:
+        other = await match_queue.pop_match(user_id, theme, sub)
+        if other is None:
+            break
+
+        # Одна транзакция: state=chatting, companion_id, таймер — только если оба ещё ищут
+        try:
+            paired = await pair_users(user_id, other.user_id)
+        except Exception:
+            await match_queue.requeue(other)
+            raise
+        if paired:
+            break
+
+        # Пара не сложилась: либо кандидат уже не ищет (выбрасываем его из индекса),
+        # либо не ищем мы сами — тогда кандидата возвращаем на его место и выходим
+        me = await get_user(user_id)
+        if not me or me.get("state") != "searching":
+            await match_queue.requeue(other)
+            await match_queue.remove(user_id)
+            logger.debug("add_to_queue: %s is no longer searching", user_id)
+            return
+        logger.debug("add_to_queue: dropping stale candidate %s", other.user_id)
+
+    if other is not None:
+        other_id = other.user_id
+        await match_queue.remove(user_id)
 
         # Остановим их ретраи, если были
-        for uid in (user_id, other_id):
-            task = active_search_tasks.pop(uid, None)
-            if task and not task.done():
-                try:
-                    task.cancel()
-                except Exception:
-                    logger.exception("Failed to cancel retry task for %s", uid)
+        search_timers.cancel(user_id)
+        search_timers.cancel(other_id)
 
         # Финальные подтемы с учётом any_sub
-        sub_a = sub if sub != "any_sub" else other.get("sub")
-        sub_b = other.get("sub") if other.get("sub") != "any_sub" else sub
-
-        # На всякий случай перечитаем пользователей (могли измениться поля)
-        try:
-            user = await get_user(user_id)
-            other = await get_user(other_id)
-        except Exception:
-            logger.exception("Failed to refetch users after matching")
+        sub_a = sub if sub != ANY_SUB else other.sub
+        sub_b = other.sub if other.sub != ANY_SUB else sub
 
-        lang_a = (user or {}).get("lang") or "en"
-        lang_b = (other or {}).get("lang") or "en"
+        # Языки взяты из индекса — перечитывать пользователей не нужно
+        lang_a = lang
+        lang_b = other.lang or "en"
 
         # Локализация темы/подтемы под язык каждого
         theme_a_local = _safe_tr(lang_a, theme)
@@ -165,13 +139,13 @@ async def add_to_queue(user_id: int, theme: str, sub: str, context):
 
         # Сборка клавиатур чата
         try:
-            markup_a = await kb_chat(user)
+            markup_a = await kb_chat({"id": user_id, "lang": lang_a})
         except Exception:
             markup_a = None
             logger.exception("Failed to build chat keyboard for %s", user_id)
 
         try:
-            markup_b = await kb_chat(other)
+            markup_b = await kb_chat({"id": other_id, "lang": lang_b})
         except Exception:
             markup_b = None
             logger.exception("Failed to build chat keyboard for %s", other_id)
@@ -203,41 +177,41 @@ async def add_to_queue(user_id: int, theme: str, sub: str, context):
         )
         return
 
-    # Пару не нашли — добавим в очередь и поставим таймер на повтор
-    if user_id not in queue:
-        queue.append(user_id)
+    # Пару не нашли — встаём в очередь (уже стоящий там сохраняет место) и ставим таймер на повтор
+    await match_queue.enqueue(user_id, theme, sub, lang)
 
     # Не дублируем таймер
-    if user_id not in active_search_tasks or active_search_tasks[user_id].done():
-        task = asyncio.create_task(retry_search(user_id, theme, sub, context))
-        active_search_tasks[user_id] = task
+    if user_id not in search_timers:
+        search_timers.schedule(user_id, SEARCH_RETRY_DELAY, retry_search, user_id, theme, sub, context)
 
 
 async def retry_search(user_id: int, theme: str, sub: str, context):
     """
-    Через минуту напоминаем про поиск и пытаемся ещё раз.
-    Отменяется, если пользователь уже вышел из поиска или сматчился.
+    Срабатывает по таймеру: напоминаем про поиск и пытаемся ещё раз (таймер ставится заново).
+    Таймер отменяется, если пользователь вышел из поиска или сматчился.
     """
     try:
-        await asyncio.sleep(60)
         user = await get_user(user_id)
         if user and user.get("state") == "searching":
             try:
                 await context.bot.send_message(
                     chat_id=user_id,
-                    text=_safe_tr(user.get("lang") or "en", "still_searching"),
+                    text=_safe_tr(user.get("lang") or "en", "searching_retry"),
                 )
             except Exception:
-                logger.exception("Failed to send still_searching to %s", user_id)
+                logger.exception("Failed to send searching reminder to %s", user_id)
 
-            await add_to_queue(user_id, theme, sub, context)
-    except asyncio.CancelledError:
-        return
+            await add_to_queue(user_id, theme, sub, context, lang=user.get("lang"))
+        else:
+            # ушёл из поиска мимо remove_from_queue (например, /start) — чистим очередь
+            await match_queue.remove(user_id)
     except Exception:
         logger.exception("retry_search failed for %s", user_id)
 
 
 async def is_in_chat(user_id: int) -> bool:
-    """Проверка: пользователь уже в активном чате?"""
+    """Проверка: пользователь уже в активном чате? Сначала — таблица пар в памяти."""
+    if companion_of(user_id) is not None:
+        return True
     user = await get_user(user_id)
     return bool(user and user.get("state") == "chatting")
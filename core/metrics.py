@@ -0,0 +1,62 @@
+# core/metrics.py
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+
+class LatencyStat:
+    """Замеры задержки: count/avg/max за всё время + перцентили по последним window замерам."""
+
+    def __init__(self, window: int = 2048):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self._recent.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict:
+        ms = 1000.0
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * ms, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * ms, 3),
+            "p95_ms": round(self.percentile(0.95) * ms, 3),
+            "p99_ms": round(self.percentile(0.99) * ms, 3),
+            "max_ms": round(self.max * ms, 3),
+        }
+
+
+_latencies: Dict[str, LatencyStat] = {}
+
+
+def latency(name: str) -> LatencyStat:
+    stat = _latencies.get(name)
+    if stat is None:
+        stat = _latencies[name] = LatencyStat()
+    return stat
+
+
+@contextmanager
+def timed(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        latency(name).observe(time.perf_counter() - started)
+
+
+def latency_snapshot() -> dict:
+    return {name: stat.snapshot() for name, stat in _latencies.items()}
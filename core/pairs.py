@@ -0,0 +1,43 @@
+# core/pairs.py
+from typing import Dict, Optional
+
+# Активные пары в памяти процесса (направленно: user_id -> companion_id)
+# и язык каждого участника — чтобы пересылать сообщения без обращений к БД.
+_companions: Dict[int, int] = {}
+_langs: Dict[int, str] = {}
+
+
+def track(user: dict):
+    """
+    Обновить таблицу по свежей строке users (вызывается слоем БД при каждой загрузке/записи):
+    state=chatting с companion_id — пользователь в паре, иначе — убираем.
+    """
+    user_id = user["id"]
+    companion_id = user.get("companion_id")
+    if user.get("state") == "chatting" and companion_id:
+        _companions[user_id] = companion_id
+        _langs[user_id] = user.get("lang") or "en"
+    else:
+        forget(user_id)
+
+
+def forget(user_id: int):
+    _companions.pop(user_id, None)
+    _langs.pop(user_id, None)
+
+
+def companion_of(user_id: int) -> Optional[int]:
+    return _companions.get(user_id)
+
+
+def lang_of(user_id: int) -> Optional[str]:
+    return _langs.get(user_id)
+
+
+def clear():
+    _companions.clear()
+    _langs.clear()
+
+
+def pairs_stats() -> dict:
+    return {"users_in_pairs": len(_companions)}
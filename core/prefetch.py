@@ -0,0 +1,99 @@
+# core/prefetch.py
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from config import TRANSLATION_PREFETCH_CONCURRENCY, TRANSLATION_PREFETCH_QUOTA_RATIO
+from core import quota
+from core.translator import try_translate
+
+logger = logging.getLogger(__name__)
+
+# translation_key -> фоновый перевод; живёт, пока текст лежит в TRANSLATION_CACHE
+_tasks: Dict[str, asyncio.Task] = {}
+_running = 0
+_stats = {
+    "started": 0,
+    "skipped": 0,    # лимит параллельных переводов занят — кнопка переведёт по нажатию
+    "quota_skips": 0,  # квота провайдеров близка к TRANSLATION_PREFETCH_QUOTA_RATIO
+    "completed": 0,
+    "failed": 0,
+    "used": 0,       # нажатие получило готовый результат
+    "joined": 0,     # нажатие дождалось ещё идущего перевода
+    "cancelled": 0,  # текст вытеснен из кэша до окончания перевода
+    "wasted": 0,     # перевод готов, но кнопку так и не нажали
+}
+
+
+async def _run(text: str, source_lang: str, target_lang: str) -> Optional[str]:
+    try:
+        translated = await try_translate(text, source_lang, target_lang)
+        _stats["completed" if translated else "failed"] += 1
+        return translated
+    except Exception:
+        _stats["failed"] += 1
+        logger.exception("Prefetch translation %s→%s failed", source_lang, target_lang)
+        return None
+
+
+def _finished(task: asyncio.Task):
+    # через done-callback: задача, отменённая до старта, не войдёт в свой finally
+    global _running
+    _running -= 1
+
+
+def prefetch(key: str, text: str, source_lang: str, target_lang: str):
+    """
+    Начать перевод в фоне при пересылке; не больше TRANSLATION_PREFETCH_CONCURRENCY одновременно
+    и только пока квота провайдеров не дошла до TRANSLATION_PREFETCH_QUOTA_RATIO.
+    """
+    global _running
+    if _running >= TRANSLATION_PREFETCH_CONCURRENCY:
+        _stats["skipped"] += 1
+        return
+    if not quota.admit_speculative(text, TRANSLATION_PREFETCH_QUOTA_RATIO):
+        _stats["quota_skips"] += 1
+        return
+    _running += 1
+    _stats["started"] += 1
+    task = asyncio.create_task(_run(text, source_lang, target_lang))
+    task.add_done_callback(_finished)
+    _tasks[key] = task
+
+
+async def take(key: str) -> Optional[str]:
+    """Забрать результат по нажатию кнопки; None — префетча не было или он не удался."""
+    task = _tasks.pop(key, None)
+    if task is None:
+        return None
+    if not task.done():
+        _stats["joined"] += 1
+        return await task
+    if task.cancelled():
+        return None
+    translated = task.result()
+    if translated:
+        _stats["used"] += 1
+    return translated
+
+
+def discard(key: str, text: str = None):
+    """on_evict для TRANSLATION_CACHE: текст вытеснен — перевод больше никому не нужен."""
+    task = _tasks.pop(key, None)
+    if task is None:
+        return
+    if task.done():
+        _stats["wasted"] += 1
+    else:
+        task.cancel()
+        _stats["cancelled"] += 1
+
+
+def prefetch_stats() -> dict:
+    started = _stats["started"]
+    return {
+        **_stats,
+        "running": _running,
+        "pending_results": len(_tasks),
+        "use_rate": round((_stats["used"] + _stats["joined"]) / started, 4) if started else 0.0,
+    }
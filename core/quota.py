@@ -0,0 +1,188 @@
+# core/quota.py
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from config import (
+    DEEPL_CHAR_LIMIT, LIBRE_CHAR_LIMIT, GOOGLE_CHAR_LIMIT, QUOTA_SOFT_RATIO,
+    DEEPL_RPS, LIBRE_RPS, GOOGLE_RPS, USER_TRANSLATIONS_PER_MINUTE,
+)
+from core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, не больше capacity про запас."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+
+def _current_month() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+class ProviderQuota:
+    """
+    Расход символов провайдера за календарный месяц (UTC) и его лимит запросов в секунду.
+    Счёт ведётся локально и периодически сверяется с провайдером (sync), если тот это умеет.
+    """
+
+    def __init__(self, name: str, char_limit: int, rps: float):
+        self.name = name
+        self.char_limit = char_limit
+        self.bucket = TokenBucket(rps, max(1.0, rps)) if rps > 0 else None
+        self.month = _current_month()
+        self.chars = 0
+        self.requests = 0
+        self.synced_at: Optional[datetime] = None
+        self.stats = {"near_quota_skips": 0, "throttled": 0}
+
+    def _roll_month(self):
+        month = _current_month()
+        if month != self.month:
+            self.month = month
+            self.chars = 0
+            self.requests = 0
+
+    def fits(self, chars: int, ratio: float) -> bool:
+        """Останется ли расход в пределах ratio месячного лимита."""
+        self._roll_month()
+        return not self.char_limit or self.chars + chars <= self.char_limit * ratio
+
+    def admit(self, chars: int) -> bool:
+        if not self.fits(chars, QUOTA_SOFT_RATIO):
+            self.stats["near_quota_skips"] += 1
+            return False
+        return True
+
+    def acquire(self) -> bool:
+        """Токен на один HTTP-запрос (пачка текстов DeepL — тоже один запрос)."""
+        self._roll_month()
+        if self.bucket is not None and not self.bucket.try_acquire():
+            self.stats["throttled"] += 1
+            return False
+        self.requests += 1
+        return True
+
+    def charge(self, chars: int):
+        self._roll_month()
+        self.chars += chars
+
+    def refund(self, chars: int):
+        self._roll_month()
+        self.chars = max(0, self.chars - chars)
+
+    def sync(self, used: int, limit: Optional[int] = None):
+        self._roll_month()
+        self.chars = used
+        if limit:
+            self.char_limit = limit
+        self.synced_at = datetime.now(timezone.utc)
+
+    def snapshot(self) -> dict:
+        self._roll_month()
+        return {
+            "month": self.month,
+            "chars": self.chars,
+            "char_limit": self.char_limit,
+            "used_ratio": round(self.chars / self.char_limit, 4) if self.char_limit else 0.0,
+            "requests": self.requests,
+            "synced_at": self.synced_at,
+            **self.stats,
+        }
+
+
+_providers: Dict[str, ProviderQuota] = {
+    "deepl": ProviderQuota("deepl", DEEPL_CHAR_LIMIT, DEEPL_RPS),
+    "libre": ProviderQuota("libre", LIBRE_CHAR_LIMIT, LIBRE_RPS),
+    "google": ProviderQuota("google", GOOGLE_CHAR_LIMIT, GOOGLE_RPS),
+}
+
+# user_id -> TokenBucket; давно не переводившие вытесняются
+_user_buckets = TTLCache(maxsize=50000, ttl=3600)
+_user_stats = {"throttled": 0}
+
+
+def admit(provider: str, text: str) -> bool:
+    """Можно ли отправить text провайдеру: месячная квота символов не на исходе."""
+    quota = _providers.get(provider)
+    return quota is None or quota.admit(len(text))
+
+
+def admit_speculative(text: str, ratio: float) -> bool:
+    """
+    Фоновая работа (перевод наперёд) — только пока у каждого провайдера с лимитом
+    израсходовано меньше ratio квоты: остаток бережём для переводов по нажатию.
+    """
+    return all(quota.fits(len(text), ratio) for quota in _providers.values())
+
+
+def acquire(provider: str) -> bool:
+    """Лимит запросов в секунду: вызывать перед каждым HTTP-запросом к провайдеру."""
+    quota = _providers.get(provider)
+    return quota is None or quota.acquire()
+
+
+def charge(provider: str, text: str):
+    quota = _providers.get(provider)
+    if quota is not None:
+        quota.charge(len(text))
+
+
+def refund(provider: str, text: str):
+    """Запрос так и не ушёл — вернуть списанные символы."""
+    quota = _providers.get(provider)
+    if quota is not None:
+        quota.refund(len(text))
+
+
+def sync_usage(provider: str, used: int, limit: Optional[int] = None):
+    quota = _providers.get(provider)
+    if quota is not None:
+        quota.sync(used, limit)
+
+
+def mark_exhausted(provider: str):
+    """Провайдер сам сообщил, что квота кончилась (DeepL отвечает 456)."""
+    quota = _providers.get(provider)
+    if quota is not None and quota.char_limit:
+        quota.sync(max(quota.chars, quota.char_limit))
+
+
+def allow_user(user_id: int) -> bool:
+    """Лимит переводов пользователя: USER_TRANSLATIONS_PER_MINUTE с запасом на короткую серию нажатий."""
+    if USER_TRANSLATIONS_PER_MINUTE <= 0:
+        return True
+    bucket = _user_buckets.peek(user_id)
+    if bucket is None:
+        rate = USER_TRANSLATIONS_PER_MINUTE / 60
+        bucket = TokenBucket(rate, max(1.0, USER_TRANSLATIONS_PER_MINUTE / 4))
+        _user_buckets.set(user_id, bucket)
+    if bucket.try_acquire():
+        return True
+    _user_stats["throttled"] += 1
+    return False
+
+
+def quota_stats() -> dict:
+    return {
+        "providers": {name: quota.snapshot() for name, quota in _providers.items()},
+        "users_throttled": _user_stats["throttled"],
+    }
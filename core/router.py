@@ -0,0 +1,266 @@
+# core/router.py
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from core.metrics import LatencyStat
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+ProviderFn = Callable[[str, str, str], Awaitable[Optional[str]]]
+
+
+class ProviderSkipped(Exception):
+    """Провайдер отказался от запроса, не обращаясь к сервису (лимит запросов), — не ошибка здоровья."""
+
+
+class ProviderHealth:
+    """
+    Скользящее здоровье провайдера и его автомат-предохранитель:
+    closed — работает; open — после серии ошибок или высокой доли ошибок, не вызывается cooldown секунд;
+    half_open — пропускается одна пробная попытка, её исход закрывает или снова открывает предохранитель.
+    Доля ошибок считается по последним window исходам не старше horizon секунд.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        priority: int,
+        window: int,
+        horizon: float,
+        failure_threshold: int,
+        error_rate_threshold: float,
+        cooldown: float,
+    ):
+        self.name = name
+        self.priority = priority
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown = cooldown
+        self.horizon = horizon
+        self.latency = LatencyStat(window=window)
+        self._outcomes = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.probing = False
+        self.stats = {"calls": 0, "failures": 0, "opened": 0, "cancelled": 0}
+
+    def _recent(self) -> List[bool]:
+        cutoff = time.monotonic() - self.horizon
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+        return [ok for _, ok in self._outcomes]
+
+    @property
+    def error_rate(self) -> float:
+        recent = self._recent()
+        if not recent:
+            return 0.0
+        return recent.count(False) / len(recent)
+
+    def available(self) -> bool:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            return not self.probing
+        return self.state == CLOSED
+
+    def record_success(self, seconds: float):
+        self.latency.observe(seconds)
+        self._outcomes.append((time.monotonic(), True))
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            logger.info("Provider %s recovered, circuit closed", self.name)
+            self.state = CLOSED
+
+    def record_failure(self):
+        self.stats["failures"] += 1
+        self._outcomes.append((time.monotonic(), False))
+        self.consecutive_failures += 1
+        tripped = (
+            self.consecutive_failures >= self.failure_threshold
+            or (
+                len(self._recent()) >= self.failure_threshold * 2
+                and self.error_rate >= self.error_rate_threshold
+            )
+        )
+        if self.state == HALF_OPEN or (self.state == CLOSED and tripped):
+            logger.warning(
+                "Provider %s circuit opened (error rate %.2f, %d in a row)",
+                self.name, self.error_rate, self.consecutive_failures
+            )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.stats["opened"] += 1
+
+    def sort_key(self) -> tuple:
+        # здоровые — в порядке приоритета (качества), «шумные» за последние horizon секунд — после них
+        degraded = (
+            len(self._recent()) >= self.failure_threshold
+            and self.error_rate >= self.error_rate_threshold / 2
+        )
+        return (degraded, self.priority)
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate, 4),
+            "consecutive_failures": self.consecutive_failures,
+            **self.stats,
+            "latency": self.latency.snapshot(),
+        }
+
+
+class ProviderRouter:
+    """
+    Вызывает провайдеров перевода по здоровью, а не строго по списку.
+    Открытые предохранители пропускаются, а после cooldown провайдер проверяется
+    фоновой пробой, не задерживая пользователя; при hedge=True, если первый провайдер не ответил
+    за свой p95 (в пределах hedge_min..hedge_max), параллельно запускается следующий
+    и берётся первый успешный ответ.
+    admit(name, text) — необязательный допуск (квоты): провайдер, которому отказано,
+    в этом запросе пропускается, но ошибкой не считается; так же — ProviderSkipped из самого вызова.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Tuple[str, ProviderFn]],
+        window: int = 50,
+        horizon: float = 300.0,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        cooldown: float = 30.0,
+        hedge: bool = False,
+        hedge_min: float = 0.3,
+        hedge_max: float = 2.0,
+        admit: Optional[Callable[[str, str], bool]] = None,
+    ):
+        self._providers = {name: fn for name, fn in providers}
+        self._health = {
+            name: ProviderHealth(name, i, window, horizon, failure_threshold, error_rate_threshold, cooldown)
+            for i, (name, _) in enumerate(providers)
+        }
+        self.hedge = hedge
+        self.hedge_min = hedge_min
+        self.hedge_max = hedge_max
+        self._admit = admit or (lambda name, text: True)
+        self._probes = set()
+        self._stats = {
+            "requests": 0, "failed": 0, "hedged": 0, "hedge_wins": 0, "probes": 0, "not_admitted": 0,
+        }
+
+    def ordered(self) -> List[ProviderHealth]:
+        closed = [h for h in self._health.values() if h.available() and h.state == CLOSED]
+        return sorted(closed, key=ProviderHealth.sort_key)
+
+    def _candidates(self, text: str, source_lang: str, target_lang: str) -> List[ProviderHealth]:
+        candidates = self.ordered()
+        recovering = [h for h in self._health.values() if h.state == HALF_OPEN and h.available()]
+        if not candidates:
+            # живых нет — пробуем восстанавливающихся прямо в запросе
+            return sorted(recovering, key=ProviderHealth.sort_key)
+        for health in recovering:
+            if not self._admit(health.name, text):
+                continue
+            self._stats["probes"] += 1
+            probe = self._start(health, text, source_lang, target_lang)
+            self._probes.add(probe)
+            probe.add_done_callback(self._probes.discard)
+        return candidates
+
+    def _hedge_delay(self, health: ProviderHealth) -> float:
+        if health.latency.count < 10:
+            return self.hedge_max
+        return min(self.hedge_max, max(self.hedge_min, health.latency.percentile(0.95)))
+
+    def _usable(self, health: ProviderHealth, text: str) -> bool:
+        if self._admit(health.name, text):
+            return True
+        self._stats["not_admitted"] += 1
+        return False
+
+    def _start(self, health: ProviderHealth, text: str, source_lang: str, target_lang: str):
+        health.stats["calls"] += 1
+        if health.state == HALF_OPEN:
+            # пробу занимаем сразу, чтобы соседние запросы её не продублировали
+            health.probing = True
+        return asyncio.create_task(self._call(health, text, source_lang, target_lang))
+
+    async def _call(self, health: ProviderHealth, text: str, source_lang: str, target_lang: str):
+        started = time.perf_counter()
+        try:
+            result = await self._providers[health.name](text, source_lang, target_lang)
+        except asyncio.CancelledError:
+            health.stats["cancelled"] += 1
+            raise
+        except ProviderSkipped:
+            self._stats["not_admitted"] += 1
+            return health.name, None
+        except Exception as e:
+            logger.warning("Provider %s failed: %s", health.name, e)
+            result = None
+        finally:
+            health.probing = False
+
+        if result:
+            health.record_success(time.perf_counter() - started)
+        else:
+            health.record_failure()
+        return health.name, result
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        self._stats["requests"] += 1
+        remaining = self._candidates(text, source_lang, target_lang)
+
+        while remaining:
+            primary = remaining.pop(0)
+            # за время ожидания предыдущих провайдеров предохранитель мог открыться
+            if not primary.available() or not self._usable(primary, text):
+                continue
+            primary_task = self._start(primary, text, source_lang, target_lang)
+            pending = {primary_task}
+            delay = self._hedge_delay(primary) if self.hedge and remaining else None
+            hedge_name = None
+
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    delay = None
+                    for task in done:
+                        name, result = task.result()
+                        if result:
+                            if name == hedge_name and primary_task in pending:
+                                self._stats["hedge_wins"] += 1
+                                # основной не уложился даже в хедж — для здоровья это промах,
+                                # иначе вечно медленный провайдер так и останется первым
+                                primary.record_failure()
+                            return result
+                    if not done:
+                        backup = next(
+                            (h for h in remaining if h.available() and self._usable(h, text)), None
+                        )
+                        if backup is not None:
+                            remaining.remove(backup)
+                            hedge_name = backup.name
+                            self._stats["hedged"] += 1
+                            pending.add(self._start(backup, text, source_lang, target_lang))
+            finally:
+                for task in pending:
+                    task.cancel()
+
+        self._stats["failed"] += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "order": [h.name for h in self.ordered()],
+            "providers": {name: h.snapshot() for name, h in self._health.items()},
+        }
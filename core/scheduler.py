@@ -0,0 +1,124 @@
+# core/scheduler.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+class _Timer:
+    __slots__ = ("rounds", "callback", "args")
+
+    def __init__(self, rounds: int, callback: Callable[..., Awaitable], args: tuple):
+        self.rounds = rounds
+        self.callback = callback
+        self.args = args
+
+
+class TimerWheel:
+    """
+    Хешированное колесо таймеров: один фоновый таск на все таймеры процесса.
+    tick — шаг колеса в секундах, slots — число ячеек; таймер длиннее оборота ждёт нужное число кругов.
+    schedule/cancel — O(1); сработавшие за тик таймеры запускаются одной пачкой.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 128):
+        self.tick = tick
+        self._slots: List[Dict[Hashable, _Timer]] = [{} for _ in range(slots)]
+        self._where: Dict[Hashable, int] = {}
+        self._cursor = 0
+        self._task: asyncio.Task | None = None
+        # запущенные пачки колбэков — держим ссылки, чтобы их не собрал GC, и дожидаемся в stop()
+        self._firing = set()
+        self._stopped = False
+        self._stats = {"scheduled": 0, "fired": 0, "cancelled": 0, "errors": 0, "batches": 0}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[..., Awaitable], *args):
+        """Запланировать callback(*args) через delay секунд; таймер с тем же ключом заменяется."""
+        self.cancel(key, count=False)
+        ticks = max(1, round(delay / self.tick))
+        slot = (self._cursor + ticks) % len(self._slots)
+        # до своей ячейки колесо дойдёт через ticks % slots тиков, дальше — полными кругами
+        rounds = (ticks - 1) // len(self._slots)
+        self._slots[slot][key] = _Timer(rounds, callback, args)
+        self._where[key] = slot
+        self._stats["scheduled"] += 1
+        self._ensure_running()
+
+    def cancel(self, key: Hashable, count: bool = True) -> bool:
+        slot = self._where.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        if count:
+            self._stats["cancelled"] += 1
+        return True
+
+    def _advance(self) -> List[_Timer]:
+        """Сдвинуть колесо на один тик и забрать сработавшие таймеры."""
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+        due = []
+        for key, timer in list(slot.items()):
+            if timer.rounds > 0:
+                timer.rounds -= 1
+                continue
+            del slot[key]
+            del self._where[key]
+            due.append(timer)
+        return due
+
+    async def _fire(self, timers: List[_Timer]):
+        self._stats["batches"] += 1
+        self._stats["fired"] += len(timers)
+        results = await asyncio.gather(
+            *(timer.callback(*timer.args) for timer in timers),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self._stats["errors"] += 1
+                logger.error("Timer callback failed", exc_info=result)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            # догоняем пропущенные тики, если цикл событий был занят
+            while loop.time() >= next_tick:
+                next_tick += self.tick
+                due = self._advance()
+                if due:
+                    task = asyncio.create_task(self._fire(due))
+                    self._firing.add(task)
+                    task.add_done_callback(self._firing.discard)
+
+    def _ensure_running(self):
+        # после stop() колесо не перезапускается: ретраи из доработки не должны его оживить
+        if self._stopped:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # уже сработавшие колбэки доводим до конца, новые не запустятся
+        while self._firing:
+            await asyncio.gather(*list(self._firing), return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"pending": len(self._where), "firing": len(self._firing), **self._stats}
@@ -1,12 +1,68 @@
 import aiohttp
+import asyncio
+import contextvars
+import hashlib
 import os
 import logging
+import re
+import time
+import unicodedata
+
+from config import QUOTA_SYNC_INTERVAL
+from core import quota
+from core.batcher import MicroBatcher
+from core.cache import TTLCache
+from core.langdetect import needs_translation
+from core.router import ProviderRouter, ProviderSkipped
+from db.init_db import get_db
 
 logger = logging.getLogger(__name__)
 
 # 🔹 Ключ DeepL
 DEEPL_API_KEY = os.getenv("DEEPL_API_KEY", "3395f8ae-54a4-47ee-8508-424cad3fe67c:fx")
 
+# 🔹 Адреса провайдеров (переопределяются для локальных стендов)
+DEEPL_URL = os.getenv("DEEPL_URL", "https://api-free.deepl.com/v2/translate")
+LIBRE_URL = os.getenv("LIBRE_URL", "https://translate.argosopentech.com/translate")
+GOOGLE_URL = os.getenv("GOOGLE_URL", "https://translate.googleapis.com/translate_a/single")
+DEEPL_USAGE_URL = os.getenv("DEEPL_USAGE_URL", DEEPL_URL.rsplit("/translate", 1)[0] + "/usage")
+
+# 🔹 Таймауты на провайдера, сек
+PROVIDER_TIMEOUTS = {
+    "deepl": aiohttp.ClientTimeout(total=float(os.getenv("DEEPL_TIMEOUT", 10)), connect=2),
+    "libre": aiohttp.ClientTimeout(total=float(os.getenv("LIBRE_TIMEOUT", 10)), connect=2),
+    "google": aiohttp.ClientTimeout(total=float(os.getenv("GOOGLE_TIMEOUT", 10)), connect=2),
+}
+
+# 🔹 Пул соединений общего HTTP-клиента
+HTTP_LIMIT_PER_HOST = int(os.getenv("TRANSLATE_HTTP_LIMIT_PER_HOST", 20))
+HTTP_KEEPALIVE = float(os.getenv("TRANSLATE_HTTP_KEEPALIVE", 60))
+HTTP_DNS_TTL = int(os.getenv("TRANSLATE_HTTP_DNS_TTL", 300))
+
+# 🔹 Пачки DeepL: окно сбора в мс (0 — без пачек) и предел текстов в одном запросе (у DeepL до 50)
+DEEPL_BATCH_WINDOW_MS = float(os.getenv("DEEPL_BATCH_WINDOW_MS", 10))
+DEEPL_BATCH_MAX = min(int(os.getenv("DEEPL_BATCH_MAX", 50)), 50)
+
+# 🔹 Маршрутизация провайдеров: предохранитель и хеджирование
+ROUTER_WINDOW = int(os.getenv("TRANSLATE_ROUTER_WINDOW", 50))
+ROUTER_HORIZON = float(os.getenv("TRANSLATE_ROUTER_HORIZON", 300))
+BREAKER_FAILURES = int(os.getenv("TRANSLATE_BREAKER_FAILURES", 3))
+BREAKER_ERROR_RATE = float(os.getenv("TRANSLATE_BREAKER_ERROR_RATE", 0.5))
+BREAKER_COOLDOWN = float(os.getenv("TRANSLATE_BREAKER_COOLDOWN", 30))
+HEDGE_ENABLED = os.getenv("TRANSLATE_HEDGE", "0") == "1"
+HEDGE_MIN_MS = float(os.getenv("TRANSLATE_HEDGE_MIN_MS", 300))
+HEDGE_MAX_MS = float(os.getenv("TRANSLATE_HEDGE_MAX_MS", 2000))
+
+# 🔹 Длинные тексты: порог в символах, целевой размер куска и параллельность
+CHUNK_THRESHOLD = int(os.getenv("TRANSLATE_CHUNK_THRESHOLD", 600))
+CHUNK_SIZE = int(os.getenv("TRANSLATE_CHUNK_SIZE", 300))
+CHUNK_CONCURRENCY = int(os.getenv("TRANSLATE_CHUNK_CONCURRENCY", 4))
+
+# 🔹 Кэш готовых переводов: память (LRU) + таблица translation_cache в Postgres
+RESULT_CACHE_SIZE = int(os.getenv("TRANSLATION_RESULT_CACHE_SIZE", 5000))
+RESULT_CACHE_TTL = float(os.getenv("TRANSLATION_RESULT_CACHE_TTL", 7 * 24 * 3600))
+RESULT_CACHE_PERSIST = os.getenv("TRANSLATION_RESULT_CACHE_PERSIST", "1") == "1"
+
 # 🔹 Соответствие кодов языков → DeepL
 DEEPL_LANG_MAP = {
     "ru": "RU",
@@ -22,85 +78,474 @@ DEEPL_LANG_MAP = {
 }
 
 
+# ---------- общий HTTP-клиент ----------
+_session: aiohttp.ClientSession | None = None
+_http_stats = {
+    "requests": 0,
+    "connections_created": 0,
+    "connections_reused": 0,
+    "dns_cache_hits": 0,
+    "dns_cache_misses": 0,
+}
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+
+    def counter(name):
+        async def _inc(session, ctx, params):
+            _http_stats[name] += 1
+        return _inc
+
+    trace.on_request_start.append(counter("requests"))
+    trace.on_connection_create_end.append(counter("connections_created"))
+    trace.on_connection_reuseconn.append(counter("connections_reused"))
+    trace.on_dns_cache_hit.append(counter("dns_cache_hits"))
+    trace.on_dns_cache_miss.append(counter("dns_cache_misses"))
+    return trace
+
+
+async def start_http_client():
+    """Открыть долгоживущую сессию с пулом keep-alive соединений (bot.on_startup)."""
+    global _session
+    if _session is not None and not _session.closed:
+        return
+    connector = aiohttp.TCPConnector(
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE,
+        ttl_dns_cache=HTTP_DNS_TTL,
+    )
+    _session = aiohttp.ClientSession(connector=connector, trace_configs=[_trace_config()])
+
+
+async def close_http_client():
+    global _session
+    # накопленные пачки DeepL уходят до закрытия сессии
+    await _deepl_batcher.drain()
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    # на случай вызова вне веб-приложения (скрипты) — откроем сессию лениво
+    if _session is None or _session.closed:
+        await start_http_client()
+    return _session
+
+
+def http_stats() -> dict:
+    created = _http_stats["connections_created"]
+    reused = _http_stats["connections_reused"]
+    return {
+        **_http_stats,
+        "reuse_rate": round(reused / (created + reused), 4) if created + reused else 0.0,
+    }
+
+
+# ---------- провайдеры ----------
+def _acquire(name: str):
+    """Токен лимита запросов берётся на каждый HTTP-запрос, а не на каждый текст в нём."""
+    if not quota.acquire(name):
+        raise ProviderSkipped(f"{name} request rate limit")
+
+
+async def _deepl_request(texts: list[str], source_lang: str, target_lang: str) -> list[str] | None:
+    """Один запрос к DeepL на несколько текстов: поле text повторяется, ответы идут в том же порядке."""
+    data = [("auth_key", DEEPL_API_KEY), ("target_lang", target_lang)]
+    data += [("text", text) for text in texts]
+
+    # Добавляем source_lang, если он не совпадает с target_lang
+    if source_lang and source_lang != target_lang:
+        data.append(("source_lang", source_lang))
+
+    _acquire("deepl")
+    session = await _get_session()
+    async with session.post(DEEPL_URL, data=data, timeout=PROVIDER_TIMEOUTS["deepl"]) as resp:
+        if resp.status == 456:
+            # квота исчерпана — до следующей сверки DeepL обходим заранее
+            quota.mark_exhausted("deepl")
+        result = await resp.json()
+
+    if "translations" in result:
+        logger.debug("DeepL translated %d text(s) %s→%s OK", len(texts), source_lang, target_lang)
+        return [item.get("text") for item in result["translations"]]
+
+    logger.warning("DeepL API error: %s", result)
+    return None
+
+
+async def _deepl_send_batch(langs: tuple, texts: list[str]) -> list[str] | None:
+    return await _deepl_request(list(texts), *langs)
+
+
+_deepl_batcher = MicroBatcher(_deepl_send_batch, DEEPL_BATCH_WINDOW_MS / 1000, DEEPL_BATCH_MAX)
+# куски длинного текста идут отдельными запросами: в одной пачке они снова стали бы «длинным текстом»
+_unbatched = contextvars.ContextVar("deepl_unbatched", default=False)
+
+
+async def _deepl(text: str, source_lang: str, target_lang: str) -> str | None:
+    if DEEPL_BATCH_WINDOW_MS <= 0 or _unbatched.get():
+        result = await _deepl_request([text], source_lang, target_lang)
+        return result[0] if result else None
+    # одновременные запросы с той же парой языков уходят в DeepL одним вызовом
+    return await _deepl_batcher.submit((source_lang, target_lang), text)
+
+
+def deepl_batch_stats() -> dict:
+    return _deepl_batcher.stats()
+
+
+async def _libre(text: str, source_lang: str, target_lang: str) -> str | None:
+    payload = {
+        "q": text,
+        "source": source_lang.lower() if source_lang else "auto",
+        "target": target_lang.lower(),
+        "format": "text",
+    }
+
+    _acquire("libre")
+    session = await _get_session()
+    async with session.post(LIBRE_URL, json=payload, timeout=PROVIDER_TIMEOUTS["libre"]) as resp:
+        result = await resp.json()
+
+    translated = result.get("translatedText")
+    if translated:
+        logger.debug("LibreTranslate translated %s→%s OK", source_lang, target_lang)
+        return translated
+
+    logger.warning("LibreTranslate error: %s", result)
+    return None
+
+
+async def _google(text: str, source_lang: str, target_lang: str) -> str | None:
+    params = {
+        "client": "gtx",
+        "sl": source_lang.lower(),
+        "tl": target_lang.lower(),
+        "dt": "t",
+        "q": text,
+    }
+
+    _acquire("google")
+    session = await _get_session()
+    async with session.get(GOOGLE_URL, params=params, timeout=PROVIDER_TIMEOUTS["google"]) as resp:
+        result = await resp.json(content_type=None)
+
+    if isinstance(result, list) and len(result) > 0 and len(result[0]) > 0:
+        logger.debug("Google Translate fallback %s→%s OK", source_lang, target_lang)
+        return "".join([seg[0] for seg in result[0] if seg[0]])
+    return None
+
+
+# ---------- квоты ----------
+def _metered(name: str, provider):
+    """Учитываем символы до вызова: провайдер считает их за запрос, даже неудачный."""
+    async def call(text: str, source_lang: str, target_lang: str) -> str | None:
+        quota.charge(name, text)
+        try:
+            return await provider(text, source_lang, target_lang)
+        except ProviderSkipped:
+            # запрос не ушёл — символы не потрачены
+            quota.refund(name, text)
+            raise
+    return call
+
+
+async def refresh_deepl_usage():
+    """Сверить расход символов с DeepL /v2/usage."""
+    if not DEEPL_API_KEY:
+        return
+    session = await _get_session()
+    async with session.get(
+        DEEPL_USAGE_URL,
+        headers={"Authorization": f"DeepL-Auth-Key {DEEPL_API_KEY}"},
+        timeout=PROVIDER_TIMEOUTS["deepl"],
+    ) as resp:
+        result = await resp.json()
+    if "character_count" in result:
+        quota.sync_usage("deepl", result["character_count"], result.get("character_limit"))
+    else:
+        logger.warning("DeepL usage error: %s", result)
+
+
+async def _quota_sync_loop():
+    while True:
+        try:
+            await refresh_deepl_usage()
+        except Exception:
+            logger.exception("Failed to refresh DeepL usage")
+        await asyncio.sleep(QUOTA_SYNC_INTERVAL)
+
+
+_quota_task: asyncio.Task | None = None
+
+
+async def start_quota_sync():
+    global _quota_task
+    if _quota_task is None or _quota_task.done():
+        _quota_task = asyncio.create_task(_quota_sync_loop())
+
+
+async def stop_quota_sync():
+    global _quota_task
+    if _quota_task is not None:
+        _quota_task.cancel()
+        _quota_task = None
+
+
+# ---------- маршрутизатор ----------
+_providers = [("libre", _metered("libre", _libre)), ("google", _metered("google", _google))]
+if DEEPL_API_KEY:
+    _providers.insert(0, ("deepl", _metered("deepl", _deepl)))
+
+_router = ProviderRouter(
+    _providers,
+    window=ROUTER_WINDOW,
+    horizon=ROUTER_HORIZON,
+    failure_threshold=BREAKER_FAILURES,
+    error_rate_threshold=BREAKER_ERROR_RATE,
+    cooldown=BREAKER_COOLDOWN,
+    hedge=HEDGE_ENABLED,
+    hedge_min=HEDGE_MIN_MS / 1000,
+    hedge_max=HEDGE_MAX_MS / 1000,
+    admit=quota.admit,
+)
+
+
+def provider_stats() -> dict:
+    """Состояние предохранителей, доли ошибок и задержки провайдеров — для мониторинга."""
+    return _router.stats()
+
+
+# ---------- кэш результатов ----------
+_result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+_result_stats = {"db_hits": 0, "db_misses": 0, "db_errors": 0, "not_needed": 0, "db_pruned": 0}
+# просроченные строки translation_cache удаляются попутно с записью, не чаще раза в интервал
+_PRUNE_INTERVAL = 600
+_last_prune = 0.0
+# фоновые записи в translation_cache — держим ссылки, чтобы их не собрал GC, и дожидаемся при остановке
+_store_tasks: set[asyncio.Task] = set()
+
+# ключ кэша -> идущий перевод (single-flight)
+_inflight: dict[str, asyncio.Task] = {}
+_flight_stats = {"leaders": 0, "joined": 0}
+_chunk_stats = {"texts": 0, "chunks": 0, "failed": 0}
+
+
+def _cache_key(text: str, source_lang: str, target_lang: str) -> str:
+    """Ключ — хеш нормализованного текста и пары языков (регистр сохраняем: он влияет на перевод)."""
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    raw = f"{source_lang}|{target_lang}|{normalized}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _stored_result(key: str) -> str | None:
+    """Перевод из таблицы translation_cache (память уже проверена)."""
+    if not RESULT_CACHE_PERSIST:
+        return None
+
+    pool = await get_db()
+    if pool is None:
+        return None
+    try:
+        async with pool.acquire() as conn:
+            translated = await conn.fetchval(
+                """
+                SELECT translated FROM translation_cache
+                WHERE key = $1 AND created_at > now() - make_interval(secs => $2)
+                """,
+                key, RESULT_CACHE_TTL
+            )
+    except Exception:
+        _result_stats["db_errors"] += 1
+        logger.exception("Failed to read translation cache")
+        return None
+
+    if translated is None:
+        _result_stats["db_misses"] += 1
+        return None
+    _result_stats["db_hits"] += 1
+    _result_cache.set(key, translated)
+    return translated
+
+
+async def _store_result(key: str, source_lang: str, target_lang: str, translated: str):
+    global _last_prune
+    pool = await get_db()
+    if pool is None:
+        return
+    try:
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO translation_cache (key, source_lang, target_lang, translated)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (key) DO UPDATE
+                SET translated = EXCLUDED.translated, created_at = now()
+                """,
+                key, source_lang, target_lang, translated
+            )
+            now = time.monotonic()
+            if now - _last_prune >= _PRUNE_INTERVAL:
+                _last_prune = now
+                status = await conn.execute(
+                    "DELETE FROM translation_cache WHERE created_at < now() - make_interval(secs => $1)",
+                    RESULT_CACHE_TTL
+                )
+                _result_stats["db_pruned"] += int(status.split()[-1])
+    except Exception:
+        _result_stats["db_errors"] += 1
+        logger.exception("Failed to store translation in cache")
+
+
+def _remember_result(key: str, source_lang: str, target_lang: str, translated: str):
+    _result_cache.set(key, translated)
+    if RESULT_CACHE_PERSIST:
+        # запись на диск не задерживает ответ пользователю
+        task = asyncio.create_task(_store_result(key, source_lang, target_lang, translated))
+        _store_tasks.add(task)
+        task.add_done_callback(_store_tasks.discard)
+
+
+async def flush_result_writes():
+    """Дождаться фоновых записей в translation_cache (остановка приложения)."""
+    while _store_tasks:
+        await asyncio.gather(*list(_store_tasks), return_exceptions=True)
+
+
+def translation_cache_stats() -> dict:
+    memory = _result_cache.stats()
+    hits = memory["hits"] + _result_stats["db_hits"]
+    lookups = memory["hits"] + memory["misses"]
+    return {
+        "memory": memory,
+        **_result_stats,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
 async def translate_text(text: str, source_lang: str, target_lang: str) -> str:
     """
-    Перевод текста через DeepL, fallback — LibreTranslate.
+    Перевод текста через DeepL, fallback — LibreTranslate, затем Google.
+    Готовые переводы берутся из кэша (память → Postgres) без обращения к провайдерам.
     """
     if not text or not text.strip():
         return "⚠️ Нет текста для перевода"
 
+    translated = await try_translate(text, source_lang, target_lang)
+    return translated or "⚠️ Перевод временно недоступен"
+
+
+async def try_translate(text: str, source_lang: str, target_lang: str) -> str | None:
+    """Как translate_text, но без текстов-заглушек: None — перевести не удалось."""
     text = text.strip()
+    if not text:
+        return None
+
+    # эмодзи, ссылки, числа или текст уже на нужном языке — провайдер не нужен
+    if not needs_translation(text, target_lang):
+        _result_stats["not_needed"] += 1
+        return text
 
     # Нормализуем коды языков
     target_lang = DEEPL_LANG_MAP.get(target_lang.lower(), target_lang.upper())
     source_lang = DEEPL_LANG_MAP.get(source_lang.lower(), source_lang.upper())
 
-    # --- Попытка через DeepL ---
-    if DEEPL_API_KEY:
-        url = "https://api-free.deepl.com/v2/translate"
-        data = {
-            "auth_key": DEEPL_API_KEY,
-            "text": text,
-            "target_lang": target_lang,
-        }
+    if len(text) > CHUNK_THRESHOLD:
+        chunks = _split_chunks(text)
+        if len(chunks) > 1:
+            return await _translate_chunks(chunks, source_lang, target_lang)
+    return await _translate_piece(text, source_lang, target_lang)
 
-        # Добавляем source_lang, если он не совпадает с target_lang
-        if source_lang and source_lang != target_lang:
-            data["source_lang"] = source_lang
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=data, timeout=10) as resp:
-                    result = await resp.json()
+async def _translate_piece(text: str, source_lang: str, target_lang: str) -> str | None:
+    key = _cache_key(text, source_lang, target_lang)
+    translated = _result_cache.get(key)
+    if translated is not None:
+        return translated
 
-                    if "translations" in result:
-                        translated = result["translations"][0]["text"]
-                        logger.debug("DeepL translated %s→%s OK", source_lang, target_lang)
-                        return translated
+    # одинаковые одновременные запросы ждут один и тот же перевод
+    task = _inflight.get(key)
+    if task is None:
+        _flight_stats["leaders"] += 1
+        task = _inflight[key] = asyncio.create_task(_load(key, text, source_lang, target_lang))
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        _flight_stats["joined"] += 1
+    # shield: отмена одного ожидающего не отменяет перевод остальным
+    return await asyncio.shield(task)
 
-                    logger.warning("DeepL API error: %s", result)
-        except Exception as e:
-            logger.warning("DeepL translation failed: %s", e)
 
-    # --- Попытка через LibreTranslate ---
-    try:
-        url = "https://translate.argosopentech.com/translate"
-        payload = {
-            "q": text,
-            "source": source_lang.lower() if source_lang else "auto",
-            "target": target_lang.lower(),
-            "format": "text",
-        }
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, timeout=10) as resp:
-                result = await resp.json()
-                translated = result.get("translatedText")
-                if translated:
-                    logger.debug("LibreTranslate translated %s→%s OK", source_lang, target_lang)
-                    return translated
-                logger.warning("LibreTranslate error: %s", result)
-    except Exception as e:
-        logger.warning("LibreTranslate failed: %s", e)
-
-        # --- Google Translate Fallback ---
-    try:
-        url = "https://translate.googleapis.com/translate_a/single"
-        params = {
-            "client": "gtx",
-            "sl": source_lang.lower(),
-            "tl": target_lang.lower(),
-            "dt": "t",
-            "q": text,
-        }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, timeout=10) as resp:
-                result = await resp.json()
-                if isinstance(result, list) and len(result) > 0 and len(result[0]) > 0:
-                    translated = "".join([seg[0] for seg in result[0] if seg[0]])
-                    logger.debug("Google Translate fallback %s→%s OK", source_lang, target_lang)
-                    return translated
-    except Exception as e:
-        logger.warning("Google Translate fallback failed: %s", e)
-
-    return "⚠️ Перевод временно недоступен"
+async def _load(key: str, text: str, source_lang: str, target_lang: str) -> str | None:
+    translated = await _stored_result(key)
+    if translated is not None:
+        return translated
+
+    translated = await _translate_uncached(text, source_lang, target_lang)
+    if translated:
+        _remember_result(key, source_lang, target_lang, translated)
+    return translated
+
+
+def single_flight_stats() -> dict:
+    return {**_flight_stats, "in_flight": len(_inflight)}
+
+
+# ---------- длинные тексты ----------
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|\n\s*")
+
+
+def _split_chunks(text: str) -> list[tuple[str, str]]:
+    """
+    Режем по границам предложений и склеиваем их в куски до CHUNK_SIZE символов.
+    Каждый кусок — (текст, разделитель после него), чтобы собрать перевод с теми же переносами.
+    """
+    chunks: list[tuple[str, str]] = []
+    current, current_sep, pos = "", "", 0
+    for match in _SENTENCE_END.finditer(text):
+        sentence, sep = text[pos:match.start()], match.group()
+        pos = match.end()
+        if current and len(current) + len(sentence) > CHUNK_SIZE:
+            chunks.append((current, current_sep))
+            current = ""
+        current = f"{current}{current_sep}{sentence}" if current else sentence
+        current_sep = sep
+        # абзац — естественная граница куска
+        if "\n" in sep:
+            chunks.append((current, sep))
+            current = ""
+    tail = text[pos:]
+    if current and len(current) + len(tail) > CHUNK_SIZE:
+        chunks.append((current, current_sep))
+        current = ""
+    if tail or current:
+        chunks.append((f"{current}{current_sep}{tail}" if current else tail, ""))
+    return [(chunk, sep) for chunk, sep in chunks if chunk.strip()]
+
+
+async def _translate_chunks(chunks: list[tuple[str, str]], source_lang: str, target_lang: str) -> str | None:
+    """Куски переводятся параллельно (не больше CHUNK_CONCURRENCY) через кэш; None — не перевёлся хоть один."""
+    semaphore = asyncio.Semaphore(CHUNK_CONCURRENCY)
+
+    async def one(chunk: str) -> str | None:
+        _unbatched.set(True)
+        async with semaphore:
+            return await _translate_piece(chunk, source_lang, target_lang)
+
+    _chunk_stats["texts"] += 1
+    _chunk_stats["chunks"] += len(chunks)
+    results = await asyncio.gather(*(one(chunk) for chunk, _ in chunks))
+    if not all(results):
+        _chunk_stats["failed"] += 1
+        return None
+    return "".join(f"{translated}{sep}" for translated, (_, sep) in zip(results, chunks))
+
+
+def chunk_stats() -> dict:
+    return dict(_chunk_stats)
+
+
+async def _translate_uncached(text: str, source_lang: str, target_lang: str) -> str | None:
+    """Провайдеры по здоровью (DeepL → LibreTranslate → Google, пока все живы); None — не перевёл никто."""
+    return await _router.translate(text, source_lang, target_lang)
@@ -0,0 +1,105 @@
+# db/counters.py
+import asyncio
+import logging
+
+from db.init_db import get_db
+from config import MESSAGE_FLUSH_INTERVAL, MESSAGE_FLUSH_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Накопленные, но ещё не записанные приращения messages_sent: user_id -> delta
+_pending: dict[int, int] = {}
+_flush_lock = asyncio.Lock()
+_flush_task: asyncio.Task | None = None
+# внеочередные сбросы по порогу — держим ссылки, чтобы их не собрал GC, и дожидаемся при остановке
+_threshold_flushes: set[asyncio.Task] = set()
+
+_stats = {
+    "flushes": 0,
+    "flushed_rows": 0,
+    "flushed_messages": 0,
+    "flush_errors": 0,
+}
+
+
+def add_messages(user_id: int, count: int = 1):
+    """Учесть сообщения в буфере; при переполнении — запустить внеочередной сброс."""
+    _pending[user_id] = _pending.get(user_id, 0) + count
+    if len(_pending) >= MESSAGE_FLUSH_THRESHOLD and not _flush_lock.locked() and not _threshold_flushes:
+        task = asyncio.create_task(flush_messages())
+        _threshold_flushes.add(task)
+        task.add_done_callback(_threshold_flushes.discard)
+
+
+def pending_messages(user_id: int) -> int:
+    return _pending.get(user_id, 0)
+
+
+async def flush_messages() -> int:
+    """Записать все накопленные приращения одним UPDATE ... FROM unnest(...)."""
+    global _pending
+    async with _flush_lock:
+        if not _pending:
+            return 0
+        batch, _pending = _pending, {}
+
+        try:
+            pool = await get_db()
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    UPDATE users AS u
+                    SET messages_sent = COALESCE(u.messages_sent, 0) + d.delta
+                    FROM unnest($1::bigint[], $2::int[]) AS d(id, delta)
+                    WHERE u.id = d.id
+                    """,
+                    list(batch.keys()), list(batch.values())
+                )
+        except Exception:
+            # вернём приращения в буфер — запишем при следующем сбросе
+            for user_id, delta in batch.items():
+                _pending[user_id] = _pending.get(user_id, 0) + delta
+            _stats["flush_errors"] += 1
+            logger.exception("Failed to flush %s message counters", len(batch))
+            return 0
+
+        _stats["flushes"] += 1
+        _stats["flushed_rows"] += len(batch)
+        _stats["flushed_messages"] += sum(batch.values())
+        logger.debug("Flushed message counters for %s users", len(batch))
+        return len(batch)
+
+
+async def _flush_loop():
+    while True:
+        await asyncio.sleep(MESSAGE_FLUSH_INTERVAL)
+        await flush_messages()
+
+
+def start_message_flusher():
+    global _flush_task
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.create_task(_flush_loop())
+
+
+async def stop_message_flusher():
+    """Остановить периодический сброс и гарантированно дописать остаток."""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+    while _threshold_flushes:
+        await asyncio.gather(*list(_threshold_flushes), return_exceptions=True)
+    await flush_messages()
+
+
+def message_counter_stats() -> dict:
+    return {
+        "pending_users": len(_pending),
+        "pending_messages": sum(_pending.values()),
+        **_stats,
+    }
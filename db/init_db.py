@@ -1,37 +1,34 @@
 import asyncpg
 import logging
 from config import DATABASE_URL
+from db.migrations import migrate
 
 logger = logging.getLogger(__name__)
 pool = None
+# Вызываются для каждого нового соединения пула (например, логгер запросов нагрузочного стенда)
+_connection_hooks = []
+
+
+def add_connection_hook(hook):
+    """hook(conn) — синхронная настройка соединения; регистрировать до init_db()."""
+    _connection_hooks.append(hook)
+
+
+async def _init_connection(conn):
+    for hook in _connection_hooks:
+        hook(conn)
+
 
 async def init_db():
     global pool
     try:
-        pool = await asyncpg.create_pool(DATABASE_URL)
+        pool = await asyncpg.create_pool(DATABASE_URL, init=_init_connection)
         logger.info("DB pool = %s", pool)
 
         async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id BIGINT PRIMARY KEY,
-                    nickname TEXT,
-                    gender TEXT,
-                    state TEXT,
-                    theme TEXT,
-                    sub TEXT,
-                    companion_id BIGINT
-                );
-            """)
-
-            # На случай, если какие-то поля не добавились ранее — добавим безопасно
-            await conn.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS companion_id BIGINT;")
-            await conn.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS nickname TEXT;")
-            await conn.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS gender TEXT;")
-            await conn.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS state TEXT;")
-            await conn.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS theme TEXT;")
-            await conn.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS sub TEXT;")
+            version = await migrate(conn)
 
+        logger.info("Schema version = %s", version)
         logger.info("✅ Database initialized")
     except Exception as e:
         print("❌ EXCEPTION in init_db:", e, flush=True)
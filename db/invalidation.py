@@ -0,0 +1,111 @@
+# db/invalidation.py
+import asyncio
+import logging
+from uuid import uuid4
+
+import asyncpg
+
+from config import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Канал, по которому инстансы сообщают друг другу об изменённых строках users
+CHANNEL = "users_changed"
+INSTANCE_ID = uuid4().hex[:12]
+
+_listener: asyncpg.Connection | None = None
+_supervisor: asyncio.Task | None = None
+_stats = {"published": 0, "received": 0, "reconnects": 0}
+_HEALTH_INTERVAL = 30
+_HEALTH_TIMEOUT = 10
+_RECONNECT_MIN = 1.0
+_RECONNECT_MAX = 60.0
+
+
+async def publish(conn, *user_ids: int):
+    """Разослать соседям id изменённых пользователей (на том же соединении, что и запись)."""
+    payload = f"{INSTANCE_ID}:" + ",".join(str(uid) for uid in user_ids)
+    await conn.execute("SELECT pg_notify($1, $2)", CHANNEL, payload)
+    _stats["published"] += 1
+
+
+async def start_listener(on_change, on_reconnect=None):
+    """
+    Слушать канал отдельным соединением; on_change(user_ids) — для чужих изменений.
+    Соединение держит фоновый таск: проверяет его и переподключается с нарастающей паузой.
+    on_reconnect() — после восстановления: уведомления за время разрыва потеряны.
+    """
+    global _supervisor
+    if _supervisor is None or _supervisor.done():
+        _supervisor = asyncio.create_task(_supervise(on_change, on_reconnect))
+
+
+async def _supervise(on_change, on_reconnect):
+    global _listener
+
+    def _callback(connection, pid, channel, payload):
+        sender, _, ids = payload.partition(":")
+        if sender == INSTANCE_ID or not ids:
+            return
+        _stats["received"] += 1
+        try:
+            on_change([int(uid) for uid in ids.split(",")])
+        except Exception:
+            logger.exception("Failed to apply invalidation %r", payload)
+
+    delay = _RECONNECT_MIN
+    attempts = 0
+    while True:
+        attempts += 1
+        lost = asyncio.Event()
+        try:
+            conn = await asyncpg.connect(DATABASE_URL)
+        except Exception:
+            logger.exception("Failed to connect invalidation listener, retrying in %.0fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RECONNECT_MAX)
+            continue
+
+        try:
+            conn.add_termination_listener(lambda _: lost.set())
+            await conn.add_listener(CHANNEL, _callback)
+            _listener = conn
+            delay = _RECONNECT_MIN
+            logger.info("Listening for user changes on %s (instance %s)", CHANNEL, INSTANCE_ID)
+
+            if attempts > 1:
+                _stats["reconnects"] += 1
+                if on_reconnect is not None:
+                    try:
+                        await on_reconnect()
+                    except Exception:
+                        logger.exception("Failed to resync after listener reconnect")
+
+            # проверка здоровья: разрыв без FIN termination listener не заметит
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), _HEALTH_INTERVAL)
+                except asyncio.TimeoutError:
+                    await asyncio.wait_for(conn.execute("SELECT 1"), _HEALTH_TIMEOUT)
+            logger.warning("Invalidation listener connection lost, reconnecting")
+        except Exception:
+            logger.exception("Invalidation listener connection is unhealthy, reconnecting")
+        finally:
+            _listener = None
+            if not conn.is_closed():
+                conn.terminate()
+
+
+async def stop_listener():
+    global _supervisor
+    if _supervisor is not None:
+        _supervisor.cancel()
+        try:
+            await _supervisor
+        except asyncio.CancelledError:
+            pass
+        _supervisor = None
+
+
+def invalidation_stats() -> dict:
+    return {"instance": INSTANCE_ID, "connected": _listener is not None, **_stats}
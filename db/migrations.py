@@ -0,0 +1,125 @@
+# db/migrations.py
+import logging
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-lock, чтобы два процесса не накатывали миграции одновременно
+_MIGRATION_LOCK_ID = 7_461_001
+
+# (версия, описание, SQL). Уже применённые версии не редактируем — только добавляем новые.
+MIGRATIONS = [
+    (1, "users table", """
+        CREATE TABLE IF NOT EXISTS users (
+            id BIGINT PRIMARY KEY,
+            nickname TEXT,
+            gender TEXT,
+            state TEXT,
+            theme TEXT,
+            sub TEXT,
+            companion_id BIGINT,
+            lang TEXT,
+            registered_at TIMESTAMPTZ DEFAULT now(),
+            messages_sent INTEGER DEFAULT 0,
+            total_minutes INTEGER DEFAULT 0,
+            chat_started_at TIMESTAMPTZ
+        );
+
+        -- базы, созданные старым init_db, получают недостающие колонки
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS nickname TEXT;
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS gender TEXT;
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS state TEXT;
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS theme TEXT;
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS sub TEXT;
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS companion_id BIGINT;
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS lang TEXT;
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS registered_at TIMESTAMPTZ DEFAULT now();
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS messages_sent INTEGER DEFAULT 0;
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS total_minutes INTEGER DEFAULT 0;
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS chat_started_at TIMESTAMPTZ;
+    """),
+    (2, "users secondary indexes", """
+        CREATE INDEX IF NOT EXISTS users_searching_idx
+            ON users (theme, sub) WHERE state = 'searching';
+        CREATE INDEX IF NOT EXISTS users_companion_idx
+            ON users (companion_id) WHERE companion_id IS NOT NULL;
+        CREATE INDEX IF NOT EXISTS users_registered_at_idx
+            ON users (registered_at);
+    """),
+    (3, "shared search queue", """
+        CREATE TABLE IF NOT EXISTS search_queue (
+            user_id BIGINT PRIMARY KEY,
+            theme TEXT NOT NULL,
+            sub TEXT NOT NULL,
+            lang TEXT,
+            enqueued_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        CREATE INDEX IF NOT EXISTS search_queue_theme_sub_idx
+            ON search_queue (theme, sub, enqueued_at);
+        CREATE INDEX IF NOT EXISTS search_queue_theme_idx
+            ON search_queue (theme, enqueued_at);
+    """),
+    (4, "translation result cache", """
+        CREATE TABLE IF NOT EXISTS translation_cache (
+            key TEXT PRIMARY KEY,
+            source_lang TEXT,
+            target_lang TEXT,
+            translated TEXT NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        CREATE INDEX IF NOT EXISTS translation_cache_created_at_idx
+            ON translation_cache (created_at);
+    """),
+    (5, "processed telegram updates", """
+        CREATE TABLE IF NOT EXISTS processed_updates (
+            update_id BIGINT PRIMARY KEY,
+            seen_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        CREATE INDEX IF NOT EXISTS processed_updates_seen_at_idx
+            ON processed_updates (seen_at);
+    """),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+async def current_version(conn) -> int:
+    try:
+        return await conn.fetchval("SELECT COALESCE(MAX(version), 0) FROM schema_version") or 0
+    except asyncpg.UndefinedTableError:
+        return 0
+
+
+async def migrate(conn) -> int:
+    """
+    Применить недостающие миграции и вернуть итоговую версию схемы.
+    Если схема актуальна — это один SELECT, без DDL.
+    """
+    if await current_version(conn) >= LATEST_VERSION:
+        return LATEST_VERSION
+
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", _MIGRATION_LOCK_ID)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+        """)
+
+        # перечитываем под локом: другой процесс мог успеть накатить
+        version = await current_version(conn)
+        for number, description, sql in MIGRATIONS:
+            if number <= version:
+                continue
+            await conn.execute(sql)
+            await conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES ($1, $2)",
+                number, description
+            )
+            logger.info("Applied migration %s: %s", number, description)
+            version = number
+
+    return version
@@ -1,29 +1,115 @@
-from datetime import datetime, timedelta
+import asyncio
+import logging
+from datetime import datetime, timezone
+
 from db.init_db import get_db  # <-- здесь используем твой файл с asyncpg
+from db.counters import message_counter_stats
+from config import STATS_RECONCILE_INTERVAL
 
-async def get_stats():
+logger = logging.getLogger(__name__)
+
+# Живые счётчики: меняются там же, где меняются данные (db/user_queries.py),
+# и периодически сверяются с БД одним запросом.
+# active_chats, как и раньше, — число пользователей с companion_id.
+# new_users_week — только из сверки: окно в 7 дней сдвигается само, живой инкремент
+# без вычитания старевших регистраций рос бы до следующей сверки.
+_counters = {
+    "total_users": 0,
+    "new_users_week": 0,
+    "searching_users": 0,
+    "active_chats": 0,
+    "messages_total": 0,
+}
+_reconciled_at: datetime | None = None
+_reconcile_task: asyncio.Task | None = None
+
+
+# ---------- хуки из слоя БД ----------
+def note_user_created():
+    _counters["total_users"] += 1
+
+
+def note_state_change(old_state: str | None, new_state: str | None):
+    if old_state == new_state:
+        return
+    if old_state == "searching":
+        _counters["searching_users"] -= 1
+    if new_state == "searching":
+        _counters["searching_users"] += 1
+
+
+def note_paired():
+    # pair_users соединяет только двух ищущих
+    _counters["searching_users"] -= 2
+    _counters["active_chats"] += 2
+
+
+def note_unpaired(users: int):
+    _counters["active_chats"] -= users
+
+
+def note_messages(count: int):
+    _counters["messages_total"] += count
+
+
+# ---------- сверка с БД ----------
+async def reconcile():
+    """Пересчитать все счётчики одним агрегирующим запросом."""
+    global _reconciled_at
     pool = await get_db()
 
     async with pool.acquire() as conn:
-        total_users = await conn.fetchval("SELECT COUNT(*) FROM users;")
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        new_users_week = await conn.fetchval(
-            "SELECT COUNT(*) FROM users WHERE registered_at >= $1;", week_ago
-        )
-        searching_users = await conn.fetchval(
-            "SELECT COUNT(*) FROM users WHERE state = 'searching';"
-        )
-        active_chats = await conn.fetchval(
-            "SELECT COUNT(*) FROM users WHERE companion_id IS NOT NULL;"
-        )
-        messages_total = await conn.fetchval(
-            "SELECT SUM(messages_sent) FROM users;"
+        row = await conn.fetchrow(
+            """
+            SELECT
+                COUNT(*) AS total_users,
+                COUNT(*) FILTER (WHERE registered_at >= now() - interval '7 days') AS new_users_week,
+                COUNT(*) FILTER (WHERE state = 'searching') AS searching_users,
+                COUNT(*) FILTER (WHERE companion_id IS NOT NULL) AS active_chats,
+                COALESCE(SUM(messages_sent), 0) AS messages_total
+            FROM users;
+            """
         )
 
+    _counters.update(dict(row))
+    # сообщения, которые ещё лежат в буфере db/counters и не дошли до БД
+    _counters["messages_total"] += message_counter_stats()["pending_messages"]
+    _reconciled_at = datetime.now(timezone.utc)
+    logger.debug("Stats reconciled: %s", _counters)
+
+
+async def _reconcile_loop():
+    while True:
+        await asyncio.sleep(STATS_RECONCILE_INTERVAL)
+        try:
+            await reconcile()
+        except Exception:
+            logger.exception("Failed to reconcile stats")
+
+
+async def start_stats_reconciler():
+    global _reconcile_task
+    try:
+        await reconcile()
+    except Exception:
+        logger.exception("Initial stats reconcile failed")
+    if _reconcile_task is None or _reconcile_task.done():
+        _reconcile_task = asyncio.create_task(_reconcile_loop())
+
+
+async def stop_stats_reconciler():
+    global _reconcile_task
+    if _reconcile_task is not None:
+        _reconcile_task.cancel()
+        _reconcile_task = None
+
+
+async def get_stats():
+    """Текущие счётчики — O(1), без запросов (кроме самой первой сверки)."""
+    if _reconciled_at is None:
+        await reconcile()
+
     return {
-        "total_users": total_users,
-        "new_users_week": new_users_week,
-        "searching_users": searching_users,
-        "active_chats": active_chats,
-        "messages_total": messages_total or 0
+        **_counters,
+        "reconciled_at": _reconciled_at,
     }
@@ -2,9 +2,18 @@
 import logging
 from datetime import datetime, timezone
 from db.init_db import get_db
+from db.counters import add_messages, pending_messages
+from db.stats import note_user_created, note_state_change, note_paired, note_unpaired, note_messages
+from core.cache import TTLCache
+from core.pairs import track as track_pair, forget as forget_pair, clear as clear_pairs
+from db.invalidation import publish, start_listener
+from config import USER_CACHE_SIZE, USER_CACHE_TTL, MULTI_INSTANCE
 
 logger = logging.getLogger(__name__)
 
+# Write-through кэш строк users: каждая запись в БД сразу отражается здесь
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
 # ---------- helpers ----------
 async def _exec(sql: str, *args):
     """Выполнить SQL и вернуть строку статуса."""
@@ -14,15 +23,66 @@ async def _exec(sql: str, *args):
     logger.debug("SQL: %s  ARGS: %s → %s", sql, args, status)
     return status
 
+def _cache_patch(user_id: int, **fields):
+    """Применить записанные поля к закэшированной строке (если она есть)."""
+    cached = _user_cache.peek(user_id)
+    if cached is not None:
+        cached.update(fields)
+
+def _cache_incr(user_id: int, field: str, delta: int):
+    cached = _user_cache.peek(user_id)
+    if cached is not None:
+        cached[field] = (cached.get(field) or 0) + delta
+
+def _remember(row) -> dict:
+    """Положить строку из БД в кэш (с учётом ещё не сброшенных счётчиков) и вернуть копию."""
+    user = dict(row)
+    user["messages_sent"] = (user.get("messages_sent") or 0) + pending_messages(user["id"])
+    _user_cache.set(user["id"], user)
+    # таблица пар в памяти следует за state/companion_id из БД
+    track_pair(user)
+    return dict(user)
+
+def invalidate_user(user_id: int):
+    _user_cache.pop(user_id)
+
+def _forget_users(user_ids: list[int]):
+    """Строки изменил другой инстанс: сбрасываем кэш и пары — перечитаем из БД при обращении."""
+    for user_id in user_ids:
+        invalidate_user(user_id)
+        forget_pair(user_id)
+
+async def start_user_sync():
+    """Несколько инстансов: подписаться на изменения users от соседей."""
+    if MULTI_INSTANCE:
+        await start_listener(_forget_users, on_reconnect=_resync_users)
+
+async def _resync_users():
+    """LISTEN восстановлен: чужие изменения за время разрыва не дошли — кэш и пары строим заново."""
+    _user_cache.clear()
+    clear_pairs()
+    await load_active_pairs()
+
+async def _publish_changes(conn, *user_ids: int):
+    if MULTI_INSTANCE and user_ids:
+        await publish(conn, *user_ids)
+
+def user_cache_stats() -> dict:
+    return _user_cache.stats()
+
 # ---------- CRUD ----------
 async def get_user(user_id: int) -> dict | None:
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return dict(cached)
+
     pool = await get_db()
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM users WHERE id = $1::BIGINT",
             user_id
         )
-        return dict(row) if row else None
+    return _remember(row) if row else None
 
 async def create_user(user_id: int, lang: str = 'ru', nickname: str | None = None):
     user = await get_user(user_id)
@@ -30,102 +90,241 @@ async def create_user(user_id: int, lang: str = 'ru', nickname: str | None = Non
         logger.debug("create_user: user %s already exists, skipping", user_id)
         return
     try:
-        status = await _exec(
-            """
-            INSERT INTO users (id, state, lang, nickname, registered_at, messages_sent, total_minutes)
-            VALUES ($1::BIGINT, 'nickname', $2, $3, $4, 0, 0)
-            """,
-            user_id, lang, nickname, datetime.now(timezone.utc)
-        )
-        logger.debug("create_user %s → %s", user_id, status)
+        pool = await get_db()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                """
+                INSERT INTO users (id, state, lang, nickname, registered_at, messages_sent, total_minutes)
+                VALUES ($1::BIGINT, 'nickname', $2, $3, $4, 0, 0)
+                RETURNING *
+                """,
+                user_id, lang, nickname, datetime.now(timezone.utc)
+            )
+            await _publish_changes(conn, user_id)
+        _remember(row)
+        note_user_created()
+        logger.debug("create_user %s → %s", user_id, row)
     except Exception:
         logger.exception("Failed to create_user %s", user_id)
 
 # ---------- Updates ----------
-async def update_user_state(user_id: int, state: str):
+# Поля, которые можно менять через update_user (имена колонок подставляются в SQL)
+_UPDATABLE_FIELDS = ("nickname", "gender", "state", "theme", "sub", "lang", "companion_id")
+
+async def update_user(user_id: int, **fields) -> dict | None:
+    """
+    Записать несколько полей одним запросом и вернуть свежую строку.
+    UPDATE срабатывает только если хоть одно значение реально меняется
+    (IS DISTINCT FROM); иначе строка просто читается. None — пользователя нет.
+    """
+    unknown = set(fields) - set(_UPDATABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"update_user: unknown fields {sorted(unknown)}")
+    if not fields:
+        return await get_user(user_id)
+
+    names = list(fields)
+    assignments = ", ".join(f"{name} = ${i}" for i, name in enumerate(names, start=2))
+    changed = " OR ".join(f"u.{name} IS DISTINCT FROM ${i}" for i, name in enumerate(names, start=2))
+    # old_state — состояние до записи, нужно живым счётчикам статистики
+    sql = f"""
+        WITH old AS (
+            SELECT id, state FROM users WHERE id = $1::BIGINT FOR UPDATE
+        ), upd AS (
+            UPDATE users AS u SET {assignments}
+            FROM old
+            WHERE u.id = old.id AND ({changed})
+            RETURNING u.*, old.state AS old_state, true AS updated
+        )
+        SELECT * FROM upd
+        UNION ALL
+        SELECT users.*, users.state AS old_state, false AS updated FROM users
+        WHERE id = $1::BIGINT AND NOT EXISTS (SELECT 1 FROM upd)
+    """
+
+    pool = await get_db()
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(sql, user_id, *fields.values())
+        if row and row["updated"]:
+            await _publish_changes(conn, user_id)
+    logger.debug("update_user %s %s → %s", user_id, fields, "ok" if row else "missing")
+
+    if not row:
+        invalidate_user(user_id)
+        return None
+    user = dict(row)
+    user.pop("updated")
+    note_state_change(user.pop("old_state"), user["state"])
+    return _remember(user)
+
+async def update_user_state(user_id: int, state: str) -> dict | None:
     try:
-        user = await get_user(user_id)
-        if not user or user.get("state") == state:
-            return
-        await _exec("UPDATE users SET state = $1 WHERE id = $2::BIGINT", state, user_id)
+        return await update_user(user_id, state=state)
     except Exception:
         logger.exception("Failed to update state for user %s", user_id)
 
-async def update_user_nickname(user_id: int, nickname: str):
+async def update_user_nickname(user_id: int, nickname: str) -> dict | None:
     try:
-        user = await get_user(user_id)
-        if not user or user.get("nickname") == nickname:
-            return
-        await _exec("UPDATE users SET nickname = $1 WHERE id = $2::BIGINT", nickname, user_id)
+        return await update_user(user_id, nickname=nickname)
     except Exception:
         logger.exception("Failed to update nickname for user %s", user_id)
 
-async def update_user_gender(user_id: int, gender: str):
+async def update_user_gender(user_id: int, gender: str) -> dict | None:
     try:
-        user = await get_user(user_id)
-        if not user or user.get("gender") == gender:
-            return
-        await _exec("UPDATE users SET gender = $1 WHERE id = $2::BIGINT", gender, user_id)
+        return await update_user(user_id, gender=gender)
     except Exception:
         logger.exception("Failed to update gender for user %s", user_id)
 
-async def update_user_theme(user_id: int, theme: str):
+async def update_user_theme(user_id: int, theme: str) -> dict | None:
     try:
-        user = await get_user(user_id)
-        if not user or user.get("theme") == theme:
-            return
-        await _exec("UPDATE users SET theme = $1 WHERE id = $2::BIGINT", theme, user_id)
+        return await update_user(user_id, theme=theme)
     except Exception:
         logger.exception("Failed to update theme for user %s", user_id)
 
-async def update_user_sub(user_id: int, sub: str):
+async def update_user_sub(user_id: int, sub: str) -> dict | None:
     try:
-        user = await get_user(user_id)
-        if not user or user.get("sub") == sub:
-            return
-        await _exec("UPDATE users SET sub = $1 WHERE id = $2::BIGINT", sub, user_id)
+        return await update_user(user_id, sub=sub)
     except Exception:
         logger.exception("Failed to update sub for user %s", user_id)
 
-async def update_user_companion(user_id: int, companion_id: int | None):
+async def update_user_companion(user_id: int, companion_id: int | None) -> dict | None:
     try:
-        user = await get_user(user_id)
-        if user and user.get("companion_id") == companion_id:
-            return
-        await _exec(
-            "UPDATE users SET companion_id = $1::BIGINT WHERE id = $2::BIGINT",
-            companion_id, user_id
-        )
+        return await update_user(user_id, companion_id=companion_id)
     except Exception:
         logger.exception("Failed to update companion for user %s", user_id)
 
-async def update_user_lang(user_id: int, lang: str):
+async def update_user_lang(user_id: int, lang: str) -> dict | None:
     try:
-        user = await get_user(user_id)
-        if not user or user.get("lang") == lang:
-            return
-        await _exec("UPDATE users SET lang = $1 WHERE id = $2::BIGINT", lang, user_id)
+        return await update_user(user_id, lang=lang)
     except Exception:
         logger.exception("Failed to update lang for user %s", user_id)
 
-# ---------- Message counter ----------
-async def increment_messages(user_id: int, count: int = 1):
-    try:
-        await _exec(
-            "UPDATE users SET messages_sent = messages_sent + $1 WHERE id = $2::BIGINT",
-            count, user_id
+# ---------- Pairs ----------
+async def pair_users(user_a: int, user_b: int) -> tuple[dict, dict] | None:
+    """
+    Атомарно соединить двух ищущих: state=chatting, companion_id друг на друга, старт таймера.
+    Срабатывает, только если оба всё ещё state='searching' и без собеседника;
+    иначе ничего не меняет и возвращает None.
+    """
+    if user_a == user_b:
+        return None
+
+    pool = await get_db()
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            WITH locked AS (
+                SELECT id FROM users
+                WHERE id IN ($1::BIGINT, $2::BIGINT)
+                  AND state = 'searching' AND companion_id IS NULL
+                ORDER BY id
+                FOR UPDATE
+            )
+            UPDATE users AS u
+            SET state = 'chatting',
+                companion_id = CASE WHEN u.id = $1::BIGINT THEN $2::BIGINT ELSE $1::BIGINT END,
+                chat_started_at = now()
+            WHERE u.id IN (SELECT id FROM locked)
+              AND (SELECT COUNT(*) FROM locked) = 2
+            RETURNING u.*
+            """,
+            user_a, user_b
         )
+        if rows:
+            await _publish_changes(conn, user_a, user_b)
+    logger.debug("pair_users %s <-> %s → %s rows", user_a, user_b, len(rows))
+
+    if len(rows) != 2:
+        return None
+    note_paired()
+    by_id = {row["id"]: _remember(row) for row in rows}
+    return by_id[user_a], by_id[user_b]
+
+async def unpair_users(user_id: int) -> tuple[dict | None, dict | None]:
+    """
+    Атомарно разорвать пару: обоим state=menu_after_sub, companion_id=NULL,
+    минуты чата (минимум 1) добавляются к total_minutes.
+    Собеседник трогается, только если он всё ещё в чате именно с user_id.
+    Возвращает (user, companion); (None, None) — пользователь не в чате.
+    """
+    pool = await get_db()
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            WITH pair AS (
+                SELECT id FROM users
+                WHERE id = $1::BIGINT
+                   OR id = (SELECT companion_id FROM users WHERE id = $1::BIGINT)
+                ORDER BY id
+                FOR UPDATE
+            )
+            UPDATE users AS u
+            SET state = 'menu_after_sub',
+                companion_id = NULL,
+                total_minutes = COALESCE(u.total_minutes, 0) + CASE
+                    WHEN u.chat_started_at IS NULL THEN 0
+                    ELSE GREATEST(1, FLOOR(EXTRACT(EPOCH FROM now() - u.chat_started_at) / 60))::int
+                END,
+                chat_started_at = NULL
+            WHERE u.id IN (SELECT id FROM pair)
+              AND u.state = 'chatting'
+              AND (u.id = $1::BIGINT OR u.companion_id = $1::BIGINT)
+            RETURNING u.*
+            """,
+            user_id
+        )
+        if rows:
+            await _publish_changes(conn, *(row["id"] for row in rows))
+    logger.debug("unpair_users %s → %s rows", user_id, len(rows))
+    note_unpaired(len(rows))
+
+    user = companion = None
+    for row in rows:
+        if row["id"] == user_id:
+            user = _remember(row)
+        else:
+            companion = _remember(row)
+    return user, companion
+
+async def load_active_pairs() -> int:
+    """
+    Прогреть кэш и таблицу пар всеми, кто сейчас в чате (при старте процесса).
+    Без БД бот стартует с пустой таблицей: пары подтянутся из get_user по мере апдейтов.
+    """
+    pool = await get_db()
+    if pool is None:
+        logger.warning("DB pool is not available, active pairs not loaded")
+        return 0
+    try:
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT * FROM users WHERE state = 'chatting' AND companion_id IS NOT NULL"
+            )
     except Exception:
-        logger.exception("Failed to increment messages for user %s", user_id)
+        logger.exception("Failed to load active pairs")
+        return 0
+    for row in rows:
+        _remember(row)
+    logger.info("Loaded %s users in active chats", len(rows))
+    return len(rows)
+
+# ---------- Message counter ----------
+async def increment_messages(user_id: int, count: int = 1):
+    """Счётчик копится в db.counters и пишется в БД пачкой (write-behind)."""
+    add_messages(user_id, count)
+    note_messages(count)
+    _cache_incr(user_id, "messages_sent", count)
 
 # ---------- CHAT TIMER ----------
 async def start_chat_timer(user_id: int):
     """Сохраняем время начала чата."""
     try:
+        now = datetime.now(timezone.utc)
         await _exec(
             "UPDATE users SET chat_started_at = $1 WHERE id = $2::BIGINT",
-            datetime.now(timezone.utc), user_id
+            now, user_id
         )
+        _cache_patch(user_id, chat_started_at=now)
         logger.debug("start_chat_timer %s", user_id)
     except Exception:
         logger.exception("Failed to start chat timer for user %s", user_id)
@@ -155,6 +354,8 @@ async def stop_chat_timer(user_id: int):
             """,
             diff_minutes, user_id
         )
+        _cache_incr(user_id, "total_minutes", diff_minutes)
+        _cache_patch(user_id, chat_started_at=None)
 
         logger.debug("stop_chat_timer %s → +%s min", user_id, diff_minutes)
 
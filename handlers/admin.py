@@ -1,13 +1,123 @@
 from db.stats import get_stats
+from core.quota import quota_stats
+from core.translator import (
+    provider_stats, translation_cache_stats, single_flight_stats, chunk_stats, deepl_batch_stats, http_stats,
+)
+from core.ingress import ingress_stats
+from core.dispatcher import dispatcher_stats
+from core.dedup import dedup_stats
+from core.metrics import latency_snapshot
+from core.pairs import pairs_stats
+from core.prefetch import prefetch_stats
+from db.user_queries import user_cache_stats
+from db.counters import message_counter_stats
+from db.invalidation import invalidation_stats
+from core.matchmaking import search_timer_stats
+from config import MULTI_INSTANCE
+
+# состояния предохранителя core/router (в Markdown «_» сломал бы разметку)
+BREAKER_STATES = {"closed": "работает", "open": "отключён", "half_open": "проверяется"}
+
 
 async def send_admin_stats(update, context):
     stats = await get_stats()
+    reconciled_at = stats["reconciled_at"]
+    reconciled = reconciled_at.strftime("%Y-%m-%d %H:%M:%S UTC") if reconciled_at else "—"
     msg = (
         f"📊 *Статистика:*\n\n"
         f"👥 Всего пользователей: {stats['total_users']}\n"
-        f"🆕 Новых за неделю: {stats['new_users_week']}\n"
+        f"🆕 Новых за неделю (на момент сверки): {stats['new_users_week']}\n"
         f"🔄 В поиске: {stats['searching_users']}\n"
         f"💬 Активных чатов: {stats['active_chats']}\n"
         f"✉️ Сообщений всего: {stats['messages_total']}\n"
     )
+    relay = latency_snapshot().get("relay")
+    if relay:
+        msg += (
+            f"⏱ Пересылка сообщения: p50 {relay['p50_ms']:.1f} мс, p95 {relay['p95_ms']:.1f} мс "
+            f"(замеров: {relay['count']})\n"
+        )
+    msg += f"👫 Пользователей в парах (память): {pairs_stats()['users_in_pairs']}\n"
+    users = user_cache_stats()
+    msg += f"🗂 Кэш пользователей: {users['size']}/{users['maxsize']}, попаданий {users['hit_rate']:.1%}\n"
+    counters = message_counter_stats()
+    msg += (
+        f"🧮 Счётчики сообщений: в буфере {counters['pending_messages']}, "
+        f"сбросов {counters['flushes']}, ошибок {counters['flush_errors']}\n"
+    )
+    if MULTI_INSTANCE:
+        sync = invalidation_stats()
+        msg += (
+            f"🔔 Синхронизация кэшей: {'на связи' if sync['connected'] else 'нет связи'}, "
+            f"получено {sync['received']}, отправлено {sync['published']}, "
+            f"переподключений {sync['reconnects']}\n"
+        )
+    timers = search_timer_stats()
+    msg += (
+        f"⏲ Таймеры поиска: ждут {timers['pending']}, сработало {timers['fired']}, "
+        f"ошибок {timers['errors']}\n"
+    )
+    msg += "\n🌐 *Переводы за месяц:*\n"
+    for name, usage in quota_stats()["providers"].items():
+        limit = f" / {usage['char_limit']} ({usage['used_ratio']:.1%})" if usage["char_limit"] else ""
+        msg += f"• {name}: {usage['chars']}{limit} симв., запросов {usage['requests']}\n"
+    router = provider_stats()
+    for name, health in router["providers"].items():
+        msg += (
+            f"🛡 {name}: {BREAKER_STATES.get(health['state'], health['state'])}, "
+            f"ошибок {health['error_rate']:.1%}, p95 {health['latency']['p95_ms']:.0f} мс\n"
+        )
+    msg += (
+        f"↪️ Хеджирование: запусков {router['hedged']}, побед {router['hedge_wins']}; "
+        f"пропущено по лимитам {router['not_admitted']}, без перевода {router['failed']}\n"
+    )
+    cache = translation_cache_stats()
+    msg += (
+        f"💾 Кэш переводов: попаданий {cache['hit_rate']:.1%} (из БД {cache['db_hits']}), "
+        f"перевод не нужен {cache['not_needed']}, очищено в БД {cache['db_pruned']}\n"
+    )
+    flight = single_flight_stats()
+    msg += f"🤝 Совмещённые запросы: {flight['joined']} к {flight['leaders']} переводам\n"
+    chunks = chunk_stats()
+    msg += (
+        f"✂️ Длинные тексты: {chunks['texts']}, кусков {chunks['chunks']}, "
+        f"не переведено {chunks['failed']}\n"
+    )
+    batches = deepl_batch_stats()
+    msg += (
+        f"📦 Пачки DeepL: {batches['batches']}, в среднем {batches['avg_batch']:.1f} текста, "
+        f"неудачных {batches['failed_batches']}\n"
+    )
+    ahead = prefetch_stats()
+    if ahead["started"] or ahead["quota_skips"]:
+        msg += (
+            f"🔮 Перевод наперёд: запущено {ahead['started']}, пригодилось {ahead['use_rate']:.1%}, "
+            f"не нажато {ahead['wasted']}, пропущено по квоте {ahead['quota_skips']}\n"
+        )
+    # handlers.messages сам импортирует этот модуль — берём его счётчики при вызове
+    from handlers.messages import translation_text_stats
+    texts = translation_text_stats()
+    msg += (
+        f"🔤 Тексты для кнопки перевода: {texts['size']}/{texts['maxsize']}, "
+        f"уже недоступны {texts['misses']}, вытеснено {texts['evictions']}\n"
+    )
+    http = http_stats()
+    msg += (
+        f"🔌 HTTP к провайдерам: запросов {http['requests']}, новых соединений {http['connections_created']}, "
+        f"повторно использовано {http['reuse_rate']:.1%}\n"
+    )
+    ingress = ingress_stats()
+    if ingress:
+        msg += (
+            f"\n📥 Очередь апдейтов: {ingress['depth']}/{ingress['capacity']}, "
+            f"ожидание p95 {ingress['wait']['p95_ms']:.0f} мс, отклонено {ingress['rejected']}\n"
+        )
+    dispatch = dispatcher_stats()
+    if dispatch:
+        msg += (
+            f"⚙️ Диспетчер: в работе {dispatch['in_flight']}, ключей {dispatch['keys']}, "
+            f"ожидание p95 {dispatch['wait']['p95_ms']:.0f} мс\n"
+        )
+    msg += f"🔁 Повторных апдейтов отброшено: {dedup_stats()['duplicates']}\n"
+    msg += f"\n🕒 Сверено с БД: {reconciled}\n"
     await update.message.reply_text(msg, parse_mode="Markdown")
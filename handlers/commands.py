@@ -1,6 +1,6 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
-from db.user_queries import get_user, create_user, update_user_state, update_user_lang
+from db.user_queries import get_user, create_user, update_user, update_user_state, update_user_lang
 from handlers.keyboards import kb_main_menu
 from core.i18n import tr_lang
 import logging
@@ -23,8 +23,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # --- Сброс старого состояния для зарегистрированного пользователя ---
     if user and user.get("lang"):
-        await update_user_state(user_id, "menu")
-        user = await get_user(user_id)
+        user = await update_user(user_id, state="menu")
         await update.message.reply_text(
             tr_lang(user["lang"], "main_menu"),
             reply_markup=await kb_main_menu(user)
@@ -69,8 +68,7 @@ async def choose_lang(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # --- Пользователь зарегистрирован — меняет язык только в настройках ---
     if user.get("state") in ["settings", "settings_lang"]:
-        await update_user_lang(user_id, lang)
-        await update_user_state(user_id, "settings")
+        user = await update_user(user_id, lang=lang, state="settings")
 
         from handlers.keyboards import kb_settings
         await query.edit_message_text(tr_lang(lang, "lang_changed"))
@@ -82,10 +80,7 @@ async def choose_lang(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # --- Если просто нажал кнопку языка вне настроек (редкая ситуация) ---
-    await update_user_lang(user_id, lang)
-    await update_user_state(user_id, "menu")
-
-    user = await get_user(user_id)
+    user = await update_user(user_id, lang=lang, state="menu")
     await query.edit_message_text(tr_lang(lang, "main_menu"))
     await context.bot.send_message(
         chat_id=user_id,
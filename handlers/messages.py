@@ -1,4 +1,6 @@
 import logging
+import time
+from uuid import uuid4
 from telegram import Update, ReplyKeyboardMarkup
 from telegram.ext import ContextTypes
 
@@ -6,15 +8,21 @@ from handlers.keyboards import kb_settings, kb_gender_settings, kb_after_sub, kb
 from handlers.keyboards import kb_choose_lang, kb_settings_lang
 from core.i18n import tr
 from db.user_queries import (
-    get_user, update_user_nickname, update_user_gender,
-    update_user_theme, update_user_lang, update_user_sub, update_user_state,
+    get_user, update_user, update_user_state,
     increment_messages
 )
 from core.topics import TOPICS
-from core.matchmaking import add_to_queue, remove_from_queue, active_search_tasks, is_in_chat
+from core.matchmaking import add_to_queue, remove_from_queue
+from core.pairs import companion_of, lang_of
+from core.metrics import latency
 from core.chat_control import end_dialog
 from handlers.admin import send_admin_stats
-from config import ADMIN_IDS
+from core.cache import TTLCache
+from core.langdetect import needs_translation
+from core.quota import allow_user
+from core import prefetch
+from config import ADMIN_IDS, TRANSLATION_TEXT_CACHE_SIZE, TRANSLATION_TEXT_TTL, TRANSLATION_TEXT_MAX_BYTES
+from config import TRANSLATION_PREFETCH, TRANSLATION_DEBOUNCE_SECONDS
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
@@ -26,8 +34,18 @@ from core.profile import send_profile
 
 logger = logging.getLogger(__name__)
 
-# --- Глобальный кэш для текстов перевода ---
-TRANSLATION_CACHE = {}
+# --- Кэш текстов для кнопки перевода: ограничен по числу, возрасту и (опционально) памяти ---
+# Текст, вытесненный или устаревший, честно отвечает «⚠️ Текст больше не доступен.»
+TRANSLATION_CACHE = TTLCache(
+    maxsize=TRANSLATION_TEXT_CACHE_SIZE,
+    ttl=TRANSLATION_TEXT_TTL,
+    max_bytes=TRANSLATION_TEXT_MAX_BYTES or None,
+    # вытесненный текст уже не переведут — его фоновый перевод отменяем
+    on_evict=prefetch.discard,
+)
+
+# Недавние нажатия кнопок перевода: (user_id, callback_data) — двойной тап не запускает второй перевод
+RECENT_TRANSLATE_PRESSES = TTLCache(maxsize=10000, ttl=TRANSLATION_DEBOUNCE_SECONDS)
 
 
 
@@ -38,8 +56,7 @@ async def handle_stop_search(user_id: int, user: dict, context):
         await remove_from_queue(user_id)
 
         # возвращаем состояние в menu_after_sub (чтобы мог снова нажать "Поиск")
-        await update_user_state(user_id, "menu_after_sub")
-        user = await get_user(user_id)
+        user = await update_user(user_id, state="menu_after_sub")
 
         await context.bot.send_message(
             user_id,
@@ -49,6 +66,75 @@ async def handle_stop_search(user_id: int, user: dict, context):
     except Exception:
         logger.exception("Failed to stop search for user %s", user_id)
 
+async def handle_chat_message(update: Update, context, user: dict, companion_id: int | None, lang_to: str | None) -> bool:
+    """
+    Сообщение пользователя в чате: кнопки «Завершить»/«Новый собеседник» или пересылка собеседнику.
+    Пересылка не ходит в БД: языки берутся из аргументов, счётчики копятся в буфере.
+    False — собеседника нет, сообщение обрабатывается дальше по state.
+    """
+    started = time.perf_counter()
+    user_id = user["id"]
+    text = (update.message.text or "").strip()
+
+    # правильная проверка на кнопку завершения — используем тот ключ, что в kb_chat
+    if text == await tr(user, "btn_end_chat"):
+        await end_dialog(user_id, context)
+        return True
+
+    if text == await tr(user, "btn_new_partner"):
+        # пользователь хочет нового партнёра — тихо закрываем текущий диалог
+        await end_dialog(user_id, context, silent=True)
+        # вернём пользователя в меню (и покажем главное меню)
+        try:
+            user = await update_user(user_id, state="menu")
+            await update.message.reply_text(await tr(user, "main_menu"), reply_markup=await kb_main_menu(user))
+            await send_profile(user_id, context)
+        except Exception:
+            logger.exception("Failed to set state=menu after new_partner for user %s", user_id)
+        return True
+
+    if not companion_id:
+        return False
+
+    # есть компаньон — пересылаем текст
+    try:
+        lang_from = user.get("lang") or "en"
+        lang_to = lang_to or "en"
+
+        # --- создаём короткий ключ и сохраняем текст в контекст ---
+        translation_key = str(uuid4())[:8]
+        TRANSLATION_CACHE.set(translation_key, text)
+
+        # --- создаём inline-кнопку, только если языки разные и в тексте есть что переводить ---
+        reply_markup = None
+        if lang_from != lang_to and needs_translation(text, lang_to):
+            reply_markup = InlineKeyboardMarkup([[
+                InlineKeyboardButton(
+                    "🌐 Показать перевод",
+                    callback_data=f"tr|{lang_from}|{lang_to}|{translation_key}"
+                )
+            ]])
+
+        # --- отправляем сообщение ---
+        await context.bot.send_message(
+            chat_id=companion_id,
+            text=text,
+            reply_markup=reply_markup
+        )
+
+        # --- перевод наперёд: к нажатию кнопки он обычно уже готов ---
+        if reply_markup and TRANSLATION_PREFETCH:
+            prefetch.prefetch(translation_key, text, lang_from, lang_to)
+
+        # --- обновляем статистику сообщений (буфер, без запросов к БД) ---
+        await increment_messages(user_id)
+        await increment_messages(companion_id)
+
+        latency("relay").observe(time.perf_counter() - started)
+    except Exception:
+        logger.exception("Failed to forward chat message from %s to %s", user_id, companion_id)
+    return True
+
 async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         if update.message is None:
@@ -68,6 +154,13 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 logger.debug("Ignoring message with bot_command entity: %s", text)
                 return
 
+        # --- Чат: быстрый путь по таблице пар в памяти (без обращений к БД) ---
+        companion_id = companion_of(user_id)
+        if companion_id is not None and lang_of(companion_id) is not None:
+            user = {"id": user_id, "lang": lang_of(user_id)}
+            await handle_chat_message(update, context, user, companion_id, lang_of(companion_id))
+            return
+
         # --- Получаем пользователя ---
         try:
             user = await get_user(user_id)
@@ -81,77 +174,22 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         state = user.get("state")
-        logger.debug("message_handler: user=%s state=%s text=%r lang=%s",
+        logger.debug("message_handler: user=%s state=%r text=%r lang=%s",
                      user_id, state, text, user.get("lang"))
 
 
-        # --- Чат ---
-        if await is_in_chat(user_id):
-            # обновим user — после матча в БД companion_id может появиться
-            user = await get_user(user_id)
+        # --- Чат, которого нет в таблице пар (после рестарта или чужой процесс) ---
+        if state == "chatting":
             companion_id = user.get("companion_id")
-        
-            # правильная проверка на кнопку завершения — используем тот ключ, что в kb_chat
-            if text == await tr(user, "btn_end_chat"):
-                await end_dialog(user_id, context)
-                return
-        
-            if text == await tr(user, "btn_new_partner"):
-                # пользователь хочет нового партнёра — тихо закрываем текущий диалог
-                await end_dialog(user_id, context, silent=True)
-                user = await get_user(user_id)
-                # вернём пользователя в меню (и покажем главное меню)
-                try:
-                    await update_user_state(user_id, "menu")
-                    user = await get_user(user_id)
-                    await update.message.reply_text(await tr(user, "main_menu"), reply_markup=await kb_main_menu(user))
-                    await send_profile(user_id, context)
-                except Exception:
-                    logger.exception("Failed to set state=menu after new_partner for user %s", user_id)
-                return
-        
-            # если есть компаньон — пересылаем текст
+            lang_to = None
             if companion_id:
-                try:
-                    from uuid import uuid4
-                    from telegram import InlineKeyboardMarkup, InlineKeyboardButton
-            
-                    companion = await get_user(companion_id)
-                    lang_from = user.get("lang", "en")
-                    lang_to = companion.get("lang", "en")
-            
-                    # --- создаём короткий ключ и сохраняем текст в контекст ---
-                    translation_key = str(uuid4())[:8]
-                    TRANSLATION_CACHE[translation_key] = text
-            
-                    # --- создаём inline-кнопку, только если языки разные ---
-                    reply_markup = None
-                    if lang_from != lang_to:
-                        reply_markup = InlineKeyboardMarkup([[
-                            InlineKeyboardButton(
-                                "🌐 Показать перевод",
-                                callback_data=f"tr|{lang_from}|{lang_to}|{translation_key}"
-                            )
-                        ]])
-            
-                    # --- отправляем сообщение ---
-                    await context.bot.send_message(
-                        chat_id=companion_id,
-                        text=text,
-                        reply_markup=reply_markup
-                    )
-            
-                    # --- обновляем статистику сообщений ---
-                    await increment_messages(user_id)
-                    await increment_messages(companion_id)
-            
-                except Exception:
-                    logger.exception("Failed to forward chat message from %s to %s", user_id, companion_id)
+                # get_user заодно заносит пару в таблицу — следующие сообщения пойдут быстрым путём
+                companion = await get_user(companion_id)
+                lang_to = (companion or {}).get("lang") or "en"
+            if await handle_chat_message(update, context, user, companion_id, lang_to):
                 return
 
         
-
-        
         # --- STOP ---
         stop_label = await tr(user, "btn_stop")
         if text == stop_label:
@@ -164,9 +202,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # --- Регистрация: nickname ---
         if state == "nickname":
             try:
-                await update_user_nickname(user_id, text)
-                await update_user_state(user_id, "gender")
-                user = await get_user(user_id)
+                user = await update_user(user_id, nickname=text, state="gender")
             except Exception:
                 logger.exception("Failed to save nickname or state for user %s", user_id)
                 await update.message.reply_text("❌ Ошибка базы. Попробуйте ещё раз или /start")
@@ -185,8 +221,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if state == "gender":
             if user.get("gender"):
                 try:
-                    await update_user_state(user_id, "menu")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="menu")
                 except Exception:
                     logger.exception("Failed to set state=menu for user %s", user_id)
                 await update.message.reply_text(await tr(user, "main_menu"), reply_markup=await kb_main_menu(user))
@@ -202,9 +237,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 return
 
             try:
-                await update_user_gender(user_id, text)
-                await update_user_state(user_id, "menu")
-                user = await get_user(user_id)
+                user = await update_user(user_id, gender=text, state="menu")
             except Exception:
                 logger.exception("Failed to update gender/state for user %s", user_id)
                 await update.message.reply_text("❌ Не удалось сохранить пол. Попробуйте ещё раз или /start")
@@ -255,11 +288,8 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 action = menu_actions[matched_key]
                 try:
                     if action == "theme":
-                        # 1️⃣ Сначала обновляем состояние
-                        await update_user_state(user_id, "theme")
-                    
-                        # 2️⃣ Обновляем пользователя, чтобы гарантировать правильный язык и состояние
-                        user = await get_user(user_id)
+                        # 1️⃣ Обновляем состояние и сразу получаем свежую строку пользователя
+                        user = await update_user(user_id, state="theme")
                     
                         # 3️⃣ Отправляем клавиатуру выбора темы
                         try:
@@ -280,11 +310,8 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     elif action == "stats":
                         await update.message.reply_text(await tr(user, "stats_in_progress"))
                     elif action == "settings":
-                        # Переводим пользователя в состояние settings
-                        await update_user_state(user_id, "settings")
-                    
-                        # Обновляем user после смены состояния
-                        user = await get_user(user_id)
+                        # Переводим пользователя в состояние settings (UPDATE ... RETURNING)
+                        user = await update_user(user_id, state="settings")
                     
                         from handlers.keyboards import kb_settings
                     
@@ -293,8 +320,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                             reply_markup=await kb_settings(user)
                         )
                     elif action == "suggest":
-                        await update_user_state(user_id, "suggest")
-                        user = await get_user(user_id)
+                        user = await update_user(user_id, state="suggest")
                         await update.message.reply_text(await tr(user, "pls_suggest"))
                     elif action == "vip":
                         await update.message.reply_text(await tr(user, "vip_soon"))
@@ -319,7 +345,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         reply_markup=await kb_searching(user)
                     )
                     # запускаем поиск
-                    await add_to_queue(user_id, user["theme"], user["sub"], context)
+                    await add_to_queue(user_id, user["theme"], user["sub"], context, lang=user.get("lang"))
         
                 except Exception:
                     logger.exception("Search setup failed for user %s", user_id)
@@ -360,8 +386,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # кнопка назад
             if text.strip() == (await tr(user, "btn_main_menu")).strip():
                 try:
-                    await update_user_state(user_id, "menu")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="menu")
                     await update.message.reply_text(await tr(user, "main_menu"), reply_markup=await kb_main_menu(user))
                     await send_profile(user_id, context)
                 except Exception:
@@ -387,9 +412,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 return
         
             try:
-                await update_user_theme(user_id, theme_key)
-                await update_user_state(user_id, "sub")
-                user = await get_user(user_id)
+                user = await update_user(user_id, theme=theme_key, state="sub")
             except Exception:
                 logger.exception("Failed to set theme/sub for user %s", user_id)
                 await update.message.reply_text("❌ Не удалось сохранить тему. Попробуйте /start.")
@@ -406,8 +429,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # кнопка назад
             if text.strip() == (await tr(user, "btn_main_menu")).strip():
                 try:
-                    await update_user_state(user_id, "menu")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="menu")
                     await update.message.reply_text(await tr(user, "main_menu"), reply_markup=await kb_main_menu(user))
                     await send_profile(user_id, context)
                 except Exception:
@@ -436,9 +458,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 return
         
             try:
-                await update_user_sub(user_id, matched_sub)
-                await update_user_state(user_id, "menu_after_sub")
-                user = await get_user(user_id)
+                user = await update_user(user_id, sub=matched_sub, state="menu_after_sub")
             except Exception:
                 logger.exception("Failed to set sub/menu_after_sub for user %s", user_id)
                 await update.message.reply_text("❌ Не удалось сохранить подбор. Попробуйте /start.")
@@ -483,8 +503,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
             # Назад
             if text in (await tr(user, "btn_main_menu"), await tr(user, "settings_back")):
-                await update_user_state(user_id, "menu")
-                user = await get_user(user_id)
+                user = await update_user(user_id, state="menu")
                 await update.message.reply_text(
                     await tr(user, "main_menu"),
                     reply_markup=await kb_main_menu(user)
@@ -508,9 +527,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text(await tr(user, "ask_new_name"))
                 return
         
-            await update_user_nickname(user_id, new_name)
-            await update_user_state(user_id, "menu")
-            user = await get_user(user_id)
+            user = await update_user(user_id, nickname=new_name, state="menu")
             await update.message.reply_text(
                 await tr(user, "name_changed"),
                 reply_markup=await kb_main_menu(user)
@@ -540,9 +557,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 )
                 return
         
-            await update_user_gender(user_id, gender_value)
-            await update_user_state(user_id, "menu")
-            user = await get_user(user_id)
+            user = await update_user(user_id, gender=gender_value, state="menu")
             await update.message.reply_text(
                 await tr(user, "gender_changed"),
                 reply_markup=await kb_main_menu(user)
@@ -553,8 +568,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if state == "menu_after_sub":
             if text == await tr(user, "btn_search"):
                 # 1) переводим в searching и показываем клавиатуру поиска — это вне try
-                await update_user_state(user_id, "searching")
-                user = await get_user(user_id)
+                user = await update_user(user_id, state="searching")
                 await update.message.reply_text(
                     await tr(user, "searching_message"),
                     reply_markup=await kb_searching(user)
@@ -562,7 +576,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
                 # 2) пытаемся поставить в очередь/сматчить
                 try:
-                    await add_to_queue(user_id, user["theme"], user["sub"], context)
+                    await add_to_queue(user_id, user["theme"], user["sub"], context, lang=user.get("lang"))
                 except Exception:
                     logger.exception("Queue/match failed for user %s", user_id)
                     # 3) ПЕРЕПРОВЕРКА: вдруг нас уже перевели в chatting до ошибки?
@@ -572,8 +586,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         return
 
                                 # Если всё-таки не в чате — мягко возвращаемся к меню после подтемы
-                    await update_user_state(user_id, "menu_after_sub")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="menu_after_sub")
                     await update.message.reply_text(
                         await tr(user, "search_failed"),
                         reply_markup=await kb_after_sub(user)
@@ -582,8 +595,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
             if text == await tr(user, "btn_change_sub"):
                 try:
-                    await update_user_state(user_id, "sub")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="sub")
                     subtopics = TOPICS[user["theme"]] + ["any_sub"]
                     keyboard = [[await tr(user, s)] for s in subtopics]
                     # 👉 Добавляем "Главное меню", чтобы можно было вернуться
@@ -598,8 +610,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
             if text == await tr(user, "btn_change_theme"):
                 try:
-                    await update_user_state(user_id, "theme")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="theme")
         
                     from handlers.keyboards import get_topic_keyboard
                     markup = await get_topic_keyboard(user)
@@ -616,8 +627,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
             if text == await tr(user, "btn_main_menu"):
                 try:
-                    await update_user_state(user_id, "menu")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="menu")
                     await update.message.reply_text(
                         await tr(user, "main_menu"),
                         reply_markup=await kb_main_menu(user)
@@ -642,8 +652,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if text == await tr(user, "btn_change_sub"):
                 try:
                     await remove_from_queue(user_id)
-                    await update_user_state(user_id, "sub")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="sub")
                     sub_keys = TOPICS[user["theme"]] + ["any_sub"]
                     keyboard = [[await tr(user, s)] for s in sub_keys]
                     await update.message.reply_text(await tr(user, "choose_sub"), reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True))
@@ -654,8 +663,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if text == await tr(user, "btn_main_menu"):
                 try:
                     await remove_from_queue(user_id)
-                    await update_user_state(user_id, "menu")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="menu")
                     await update.message.reply_text(await tr(user, "search_stopped"), reply_markup=await kb_main_menu(user))
                 except Exception:
                     logger.exception("Failed to stop search for user %s", user_id)
@@ -685,8 +693,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if text in cancel_buttons:
                 if text == btn_start:
                     try:
-                        await update_user_state(user_id, "theme")
-                        user = await get_user(user_id)
+                        user = await update_user(user_id, state="theme")
                         await update.message.reply_text(await tr(user, "pick_theme"), reply_markup=await get_topic_keyboard(user))
                     except Exception:
                         logger.exception("Failed to set state=theme from suggest for user %s", user_id)
@@ -694,8 +701,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     return
 
                 try:
-                    await update_user_state(user_id, "menu")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="menu")
                     await update.message.reply_text(await tr(user, "main_menu"), reply_markup=await kb_main_menu(user))
                 except Exception:
                     logger.exception("Failed to set state=menu from suggest for user %s", user_id)
@@ -703,8 +709,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             if not text or text.startswith("/"):
                 try:
-                    await update_user_state(user_id, "menu")
-                    user = await get_user(user_id)
+                    user = await update_user(user_id, state="menu")
                     await update.message.reply_text(await tr(user, "main_menu"), reply_markup=await kb_main_menu(user))
                 except Exception:
                     logger.exception("Failed to cancel suggest for user %s", user_id)
@@ -720,8 +725,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             await update.message.reply_text(await tr(user, "suggest_thanks"))
             try:
-                await update_user_state(user_id, "menu")
-                user = await get_user(user_id)
+                user = await update_user(user_id, state="menu")
                 await update.message.reply_text(await tr(user, "main_menu"), reply_markup=await kb_main_menu(user))
                 await send_profile(user_id, context)
             except Exception:
@@ -764,6 +768,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+def translation_text_stats() -> dict:
+    """Счётчики кэша текстов: misses — нажатия, ответившие «Текст больше не доступен»."""
+    return TRANSLATION_CACHE.stats()
+
 async def callback_query_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     data = query.data
@@ -778,12 +786,8 @@ async def callback_query_handler(update: Update, context: ContextTypes.DEFAULT_T
         lang = data.split("_")[1]
         user_id = query.from_user.id
     
-        # обновляем язык
-        await update_user_lang(user_id, lang)
-        user = await get_user(user_id)
-    
-        # возвращаем в главное меню (а не в настройки)
-        await update_user_state(user_id, "menu")
+        # обновляем язык и возвращаем в главное меню (а не в настройки) — одним запросом
+        user = await update_user(user_id, lang=lang, state="menu")
     
         # сообщение об успешном изменении языка
         msg = await tr({"lang": lang}, "lang_changed")
@@ -817,9 +821,19 @@ async def callback_query_handler(update: Update, context: ContextTypes.DEFAULT_T
         await query.answer("Ошибка данных кнопки", show_alert=True)
         return
 
+    press = (query.from_user.id, data)
+    if press in RECENT_TRANSLATE_PRESSES:
+        await query.answer("Перевожу…")
+        return
+    if not allow_user(query.from_user.id):
+        await query.answer("⏳ Слишком много переводов, попробуйте через минуту.")
+        return
+    RECENT_TRANSLATE_PRESSES.set(press, True)
+
     # достаем сохранённый текст по ключу
     text_to_translate = TRANSLATION_CACHE.get(key)
     if not text_to_translate:
+        logger.debug("Translation text %s is gone (cache: %s)", key, TRANSLATION_CACHE.stats())
         await query.answer("⚠️ Текст больше не доступен.")
         return
 
@@ -828,7 +842,9 @@ async def callback_query_handler(update: Update, context: ContextTypes.DEFAULT_T
 
     async def send_translation():
         try:
-            translated = await translate_text(text_to_translate, src_lang, dst_lang)
+            translated = await prefetch.take(key)
+            if not translated:
+                translated = await translate_text(text_to_translate, src_lang, dst_lang)
             # после успешного перевода
             TRANSLATION_CACHE.pop(key, None)
             if not translated: